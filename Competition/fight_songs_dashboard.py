@@ -4,6 +4,12 @@ import plotly.express as px
 import plotly.graph_objects as go
 
 
+# how many filter combinations keep their derived frames / figures cached
+CACHE_ENTRIES = 64
+CUBE_KEYS = ["conference", "student_writer", "trope_count", "decade"]
+TROPE_COLS = ["fight", "victory", "win_won", "rah", "nonsense", "colors", "men", "opponents", "spelling"]
+
+
 @st.cache_data
 def load_data():
     df = pd.read_csv("fight-songs-updated.csv")
@@ -22,29 +28,168 @@ def load_data():
     
     return df
 
-df = load_data()
 
-st.sidebar.header("Filters")
+@st.cache_data
+def load_cube():
+    """Per-(conference, student_writer, trope_count, decade) song counts and sums, built once.
+
+    Every summary on the page (metrics, trope counts, trope count and decade
+    distributions) is a sum over the cells that pass the filters, so a
+    filter change only scans this small cube instead of the song rows.
+    Means are kept as sums plus non-null counts so they can be re-combined.
+    """
+    df = load_data()
+    trope_cols = [c for c in TROPE_COLS if c in df.columns]
+    parts = pd.DataFrame({
+        "songs": 1,
+        "bpm_sum": df["bpm"], "bpm_n": df["bpm"].notna(),
+        "sec_sum": df["sec_duration"], "sec_n": df["sec_duration"].notna(),
+        "tropes_sum": df["trope_count"], "tropes_n": df["trope_count"].notna(),
+        "official_sum": df["official_song"] == True, "official_n": df["official_song"].notna(),
+        **{c: df[c] == True for c in trope_cols},
+    })
+    keys = [df[k] for k in CUBE_KEYS]
+    return parts.groupby(keys, dropna=False).sum().reset_index()
+
+
+def _filter_mask(frame, conf, student_only, trope_range):
+    mask = pd.Series(True, index=frame.index)
+    if conf != "All":
+        mask &= frame["conference"] == conf
+    if student_only:
+        mask &= frame["student_writer"] == True
+    if trope_range is not None:
+        mask &= frame["trope_count"].between(*trope_range)
+    return mask.fillna(False)
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def cube_slice(conf, student_only, trope_range=None):
+    cube = load_cube()
+    return cube[_filter_mask(cube, conf, student_only, trope_range)]
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def filtered_songs(conf, student_only, trope_range):
+    """The song rows behind the filters, for the views that need individual songs."""
+    df = load_data()
+    return df[_filter_mask(df, conf, student_only, trope_range)]
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def summary_metrics(conf, student_only, trope_range):
+    totals = cube_slice(conf, student_only, trope_range).drop(columns=CUBE_KEYS).sum()
+
+    def ratio(name):
+        return totals[f"{name}_sum"] / totals[f"{name}_n"] if totals[f"{name}_n"] else None
+
+    return {
+        "songs": int(totals["songs"]),
+        "bpm": ratio("bpm"),
+        "sec_duration": ratio("sec"),
+        "trope_count": ratio("tropes"),
+        "official": ratio("official"),
+    }
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def trope_counts(conf, student_only, trope_range):
+    cells = cube_slice(conf, student_only, trope_range)
+    trope_cols = [c for c in TROPE_COLS if c in cells.columns]
+    counts = cells.groupby("conference")[trope_cols].sum().reset_index()
+    counts = counts.melt(id_vars="conference", var_name="Trope", value_name="Songs")
+    return counts[counts["Songs"] > 0]
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def trope_count_distribution(conf, student_only, trope_range):
+    cells = cube_slice(conf, student_only, trope_range)
+    return cells.groupby(["trope_count", "conference"])["songs"].sum().reset_index()
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def decade_counts(conf, student_only, trope_range):
+    cells = cube_slice(conf, student_only, trope_range)
+    decade_df = cells.dropna(subset=["decade"]).groupby("decade")["songs"].sum().sort_index().reset_index()
+    decade_df.columns = ["Decade", "Count"]
+    return decade_df
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def school_stats(conf, student_only, trope_range):
+    stats = filtered_songs(conf, student_only, trope_range).groupby("school").agg({
+        "trope_count": "mean",
+        "bpm": "mean",
+        "sec_duration": "mean",
+        "conference": "first",
+        "song_name": "count"
+    }).rename(columns={"song_name": "# Songs"}).reset_index()
+    return stats.sort_values("trope_count", ascending=False)
 
-conferences = ["All"] + sorted(df["conference"].dropna().unique().tolist())
-selected_conf = st.sidebar.selectbox("Conference", conferences)
 
-if selected_conf != "All":
-    df_f = df[df["conference"] == selected_conf].copy()
-else:
-    df_f = df.copy()
+# figures are cached as resources: handed out as the same object instead of
+# being pickled and copied on every rerun like cache_data results
+@st.cache_resource(max_entries=CACHE_ENTRIES)
+def tropes_figure(conf, student_only, trope_range):
+    fig = px.bar(
+        trope_counts(conf, student_only, trope_range), x="Trope", y="Songs", color="conference",
+        barmode="group", title="Count of Songs Containing Each Trope",
+        height=480
+    )
+    fig.update_layout(xaxis_title=None)
+    return fig
 
 
-show_student_only = st.sidebar.checkbox("Only student-written songs", value=False)
-if show_student_only:
-    df_f = df_f[df_f["student_writer"] == True]
+@st.cache_resource(max_entries=CACHE_ENTRIES)
+def trope_count_figure(conf, student_only, trope_range):
+    return px.bar(
+        trope_count_distribution(conf, student_only, trope_range), x="trope_count", y="songs",
+        color="conference", title="How many tropes per song?",
+        height=420
+    )
+
+
+@st.cache_resource(max_entries=CACHE_ENTRIES)
+def scatter_figure(conf, student_only, trope_range):
+    fig = px.scatter(
+        filtered_songs(conf, student_only, trope_range),
+        x="sec_duration",
+        y="bpm",
+        size="trope_count",
+        color="conference",
+        hover_name="school",
+        hover_data=["song_name", "year", "trope_count"],
+        title="Tempo vs Length — bigger = more lyrical tropes",
+        height=580
+    )
+    fig.update_traces(marker_opacity=0.75)
+    return fig
+
 
+@st.cache_resource(max_entries=CACHE_ENTRIES)
+def decade_figure(conf, student_only, trope_range):
+    return px.line(
+        decade_counts(conf, student_only, trope_range), x="Decade", y="Count", markers=True,
+        title="Number of fight songs composed per decade"
+    )
 
-min_tropes, max_tropes = int(df_f["trope_count"].min() or 0), int(df_f["trope_count"].max() or 8)
+
+cube = load_cube()
+
+st.sidebar.header("Filters")
+
+conferences = ["All"] + sorted(cube["conference"].dropna().unique().tolist())
+selected_conf = st.sidebar.selectbox("Conference", conferences)
+
+show_student_only = st.sidebar.checkbox("Only student-written songs", value=False)
+
+present = cube_slice(selected_conf, show_student_only)["trope_count"]
+min_tropes, max_tropes = int(present.min() if len(present) else 0), int(present.max() if len(present) else 8)
 trope_range = st.sidebar.slider("Trope count range", 0, 8, (min_tropes, max_tropes))
-df_f = df_f[(df_f["trope_count"] >= trope_range[0]) & (df_f["trope_count"] <= trope_range[1])]
+filters = (selected_conf, show_student_only, tuple(trope_range))
 
-if df_f.empty:
+metrics = summary_metrics(*filters)
+if metrics["songs"] == 0:
     st.warning("No songs match the current filters.")
     st.stop()
 
@@ -53,11 +198,11 @@ st.caption("Data from fight-songs-updated.csv • ACC, Big 12, Big Ten, Pac-12,
 
 
 cols = st.columns(5)
-cols[0].metric("Songs", len(df_f), delta=None)
-cols[1].metric("Avg BPM", f"{df_f['bpm'].mean():.0f}" if not df_f["bpm"].isna().all() else "—")
-cols[2].metric("Avg Length", f"{df_f['sec_duration'].mean():.0f} s" if not df_f["sec_duration"].isna().all() else "—")
-cols[3].metric("Avg Tropes", f"{df_f['trope_count'].mean():.1f}")
-cols[4].metric("% Official", f"{df_f['official_song'].mean():.0%}" if "official_song" in df_f else "—")
+cols[0].metric("Songs", metrics["songs"], delta=None)
+cols[1].metric("Avg BPM", f"{metrics['bpm']:.0f}" if metrics["bpm"] is not None else "—")
+cols[2].metric("Avg Length", f"{metrics['sec_duration']:.0f} s" if metrics["sec_duration"] is not None else "—")
+cols[3].metric("Avg Tropes", f"{metrics['trope_count']:.1f}")
+cols[4].metric("% Official", f"{metrics['official']:.0%}" if metrics["official"] is not None else "—")
 
 
 tab1, tab2, tab3, tab4 = st.tabs(["Tropes", "Tempo × Duration", "Timeline", "Schools"])
@@ -65,80 +210,29 @@ tab1, tab2, tab3, tab4 = st.tabs(["Tropes", "Tempo × Duration", "Timeline", "Sc
 with tab1:
     st.subheader("Lyrical Tropes")
 
-    trope_cols = ["fight", "victory", "win_won", "rah", "nonsense", "colors", "men", "opponents", "spelling"]
-    trope_cols = [c for c in trope_cols if c in df_f.columns]
-
-    if trope_cols:
-        melted = df_f.melt(
-            id_vars=["school", "conference"],
-            value_vars=trope_cols,
-            var_name="Trope",
-            value_name="Present"
-        )
-        melted = melted[melted["Present"] == True]
-
-        fig_tropes = px.histogram(
-            melted, x="Trope", color="conference",
-            barmode="group", title="Count of Songs Containing Each Trope",
-            height=480
-        )
-        fig_tropes.update_layout(xaxis_title=None)
-        st.plotly_chart(fig_tropes, use_container_width=True)
+    if any(c in cube.columns for c in TROPE_COLS):
+        st.plotly_chart(tropes_figure(*filters), use_container_width=True)
 
     st.subheader("Trope Count Distribution")
-    fig_hist = px.histogram(
-        df_f, x="trope_count", color="conference",
-        title="How many tropes per song?", nbins=9,
-        height=420
-    )
-    st.plotly_chart(fig_hist, use_container_width=True)
+    st.plotly_chart(trope_count_figure(*filters), use_container_width=True)
 
 with tab2:
     st.subheader("BPM vs Duration (bubble = # of tropes)")
-
-    fig_scatter = px.scatter(
-        df_f,
-        x="sec_duration",
-        y="bpm",
-        size="trope_count",
-        color="conference",
-        hover_name="school",
-        hover_data=["song_name", "year", "trope_count"],
-        title="Tempo vs Length — bigger = more lyrical tropes",
-        height=580
-    )
-    fig_scatter.update_traces(marker_opacity=0.75)
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    st.plotly_chart(scatter_figure(*filters), use_container_width=True)
 
 with tab3:
     st.subheader("Fight Songs by Decade")
 
-    decade_df = df_f["decade"].value_counts().sort_index().reset_index()
-    decade_df.columns = ["Decade", "Count"]
-
-    fig_line = px.line(
-        decade_df, x="Decade", y="Count", markers=True,
-        title="Number of fight songs composed per decade"
-    )
-    st.plotly_chart(fig_line, use_container_width=True)
+    st.plotly_chart(decade_figure(*filters), use_container_width=True)
 
     st.subheader("Raw decade breakdown")
-    st.dataframe(decade_df, hide_index=True, use_container_width=True)
+    st.dataframe(decade_counts(*filters), hide_index=True, use_container_width=True)
 
 with tab4:
     st.subheader("Schools sorted by trope count")
 
-    school_stats = df_f.groupby("school").agg({
-        "trope_count": "mean",
-        "bpm": "mean",
-        "sec_duration": "mean",
-        "conference": "first",
-        "song_name": "count"
-    }).rename(columns={"song_name": "# Songs"}).reset_index()
-
-    school_stats = school_stats.sort_values("trope_count", ascending=False)
     st.dataframe(
-        school_stats.style.format({
+        school_stats(*filters).style.format({
             "trope_count": "{:.1f}",
             "bpm": "{:.0f}",
             "sec_duration": "{:.0f} s"
@@ -148,7 +242,7 @@ with tab4:
 
 with st.expander("See full filtered data table"):
     st.dataframe(
-        df_f.sort_values(["conference", "trope_count"], ascending=[True, False]),
+        filtered_songs(*filters).sort_values(["conference", "trope_count"], ascending=[True, False]),
         use_container_width=True
     )
 
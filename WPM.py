@@ -1,7 +1,16 @@
 import curses
 from curses import wrapper
+import sys
 import time
-import random
+
+import wpm_corpus
+import wpm_stats
+
+# Usage: python WPM.py [max_length [max_difficulty]]
+# max_difficulty is the share of capitals, digits and punctuation in a passage, 0 to 1
+
+# max redraws per second of the WPM counter, also how often an idle test wakes up
+WPM_FPS = 10
 
 
 def start_screen(stdscr):
@@ -23,28 +32,70 @@ def display_text(stdscr, target, current, wpm=0):
 
 		stdscr.addstr(0, i, char, color)
 
-def load_text():
-	with open("text.txt", "r") as f:
-		lines = f.readlines()
-		return random.choice(lines).strip()
+def load_text(corpus, max_length=None, max_difficulty=None):
+	return corpus.sample(max_length=max_length, max_difficulty=max_difficulty)
 
-def wpm_test(stdscr):
-	target_text = load_text()
+def draw_char(stdscr, target, current, i):
+	# redraw a single cell: typed chars are colored, untyped ones show the target
+	if i < len(current):
+		color = curses.color_pair(1)
+		if current[i] != target[i]:
+			color = curses.color_pair(2)
+		stdscr.addstr(0, i, current[i], color)
+	else:
+		stdscr.addstr(0, i, target[i])
+
+def draw_wpm(stdscr, wpm):
+	stdscr.move(1, 0)
+	stdscr.clrtoeol()
+	stdscr.addstr(1, 0, f"WPM: {wpm}")
+
+def display_summary(stdscr, summary):
+	stdscr.addstr(3, 0, f"Raw WPM: {summary['raw_wpm']:.0f}  Net WPM: {summary['net_wpm']:.0f}  "
+		f"Peak WPM ({wpm_stats.ROLLING_WINDOW_S}s): {summary['peak_wpm']:.0f}  Backspaces: {summary['backspaces']}")
+	if summary["slow_bigrams"]:
+		bigrams = ", ".join(f"'{pair}' {ms:.0f}ms" for pair, ms, _ in summary["slow_bigrams"])
+		stdscr.addstr(4, 0, f"Slowest bigrams: {bigrams}")
+	if summary["hot_spots"]:
+		misses = ", ".join(f"'{char}' x{count}" for char, count in summary["hot_spots"])
+		stdscr.addstr(5, 0, f"Most missed: {misses}")
+
+def wpm_test(stdscr, corpus, filters):
+	target_text = load_text(corpus, **filters)
 	current_text = []
 	wpm = 0
 	start_time = time.time()
-	stdscr.nodelay(True)
+	completed = False
+
+	# every keystroke is timed into a buffer sized up front, analyzed once the test is over
+	log = wpm_stats.KeystrokeLog(capacity=4 * len(target_text) + 64)
+
+	# draw everything once, after that only the cells that change are redrawn
+	stdscr.clear()
+	display_text(stdscr, target_text, current_text, wpm)
+	shown_wpm = wpm
+	last_wpm_draw = 0
+
+	# block in getkey for at most one frame instead of spinning with nodelay
+	stdscr.timeout(1000 // WPM_FPS)
 
 	while True:
-		time_elapsed = max(time.time() - start_time, 1)
+		now = time.time()
+		time_elapsed = max(now - start_time, 1)
 		wpm = round((len(current_text) / (time_elapsed / 60)) / 5)
 
-		stdscr.clear()
-		display_text(stdscr, target_text, current_text, wpm)
-		stdscr.refresh()
+		if wpm != shown_wpm and now - last_wpm_draw >= 1 / WPM_FPS:
+			draw_wpm(stdscr, wpm)
+			shown_wpm = wpm
+			last_wpm_draw = now
+
+		if len(current_text) < len(target_text):
+			stdscr.move(0, len(current_text))
+		stdscr.noutrefresh()
+		curses.doupdate()
 
 		if "".join(current_text) == target_text:
-			stdscr.nodelay(False)
+			completed = True
 			break
 
 		try:
@@ -52,14 +103,29 @@ def wpm_test(stdscr):
 		except:
 			continue
 
-		if ord(key) == 27:
+		if key == "\x1b":
 			break
 
 		if key in ("KEY_BACKSPACE", '\b', "\x7f"):
 			if len(current_text) > 0:
 				current_text.pop()
-		elif len(current_text) < len(target_text):
+				pos = len(current_text)
+				log.record(0, ord(target_text[pos]), pos, 0, 1)
+				draw_char(stdscr, target_text, current_text, pos)
+		elif len(key) == 1 and len(current_text) < len(target_text):
+			pos = len(current_text)
 			current_text.append(key)
+			log.record(ord(key), ord(target_text[pos]), pos, key == target_text[pos], 0)
+			draw_char(stdscr, target_text, current_text, pos)
+
+	stdscr.timeout(-1)
+
+	if completed:
+		events = log.events(session=time.time_ns())
+		summary = wpm_stats.analyze(events)
+		if summary:
+			wpm_stats.append_session(events)
+			display_summary(stdscr, summary)
 
 
 def main(stdscr):
@@ -67,9 +133,17 @@ def main(stdscr):
 	curses.init_pair(2, curses.COLOR_RED, curses.COLOR_BLACK)
 	curses.init_pair(3, curses.COLOR_WHITE, curses.COLOR_BLACK)
 
+	# text.txt is indexed once here, each round then samples a passage in constant time
+	corpus = wpm_corpus.Corpus("text.txt")
+	filters = {}
+	if len(sys.argv) > 1:
+		filters["max_length"] = int(sys.argv[1])
+	if len(sys.argv) > 2:
+		filters["max_difficulty"] = float(sys.argv[2])
+
 	start_screen(stdscr)
 	while True:
-		wpm_test(stdscr)
+		wpm_test(stdscr, corpus, filters)
 		stdscr.addstr(2, 0, "You completed the text! Press any key to continue...")
 		key = stdscr.getkey()
 		
@@ -0,0 +1,81 @@
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+
+FEATURES = ["SMA_10", "SMA_50", "Return"]
+
+
+def walk_forward(data: pd.DataFrame, train_size: int = 252, test_size: int = 21, model: str = "sgd"):
+    """Rolling walk-forward evaluation on a preprocess_data() frame.
+
+    The first train_size rows train the model, the next test_size rows are
+    predicted, then the window moves forward by test_size and repeats. The
+    features are computed once up front and the model is never refit from
+    scratch:
+      - "sgd" (default): an SGD logistic model updated with partial_fit on
+        only the rows that became known since the last window
+      - "logistic": LogisticRegression(warm_start=True), refit on the
+        expanding window but starting from the previous coefficients
+
+    Returns (windows, equity, timings): per-window accuracy, the equity curve
+    of going long whenever the model predicts an up day, and timing stats.
+    """
+    # the last row has no next-day return to score against
+    next_return = data["Return"].shift(-1).to_numpy()[:-1]
+    data = data.iloc[:-1]
+    X = data[FEATURES].to_numpy()
+    y = data["Target"].to_numpy()
+
+    scaler = StandardScaler()
+    if model == "sgd":
+        clf = SGDClassifier(loss="log_loss", random_state=0)
+    elif model == "logistic":
+        clf = LogisticRegression(warm_start=True)
+    else:
+        raise ValueError(f"Unknown model '{model}'")
+
+    rows = []
+    predictions = np.zeros(len(data), dtype=int)
+    fit_seconds = 0.0
+    start_time = time.perf_counter()
+    seen = 0
+
+    for start in range(train_size, len(data), test_size):
+        end = min(start + test_size, len(data))
+
+        t0 = time.perf_counter()
+        # only the rows added since the previous window are new information
+        new_X, new_y = X[seen:start], y[seen:start]
+        scaler.partial_fit(new_X)
+        if model == "sgd":
+            clf.partial_fit(scaler.transform(new_X), new_y, classes=[0, 1])
+        else:
+            clf.fit(scaler.transform(X[:start]), y[:start])
+        seen = start
+        fit_seconds += time.perf_counter() - t0
+
+        pred = clf.predict(scaler.transform(X[start:end]))
+        predictions[start:end] = pred
+        rows.append({
+            "start": data.index[start],
+            "end": data.index[end - 1],
+            "accuracy": float(np.mean(pred == y[start:end])),
+        })
+
+    windows = pd.DataFrame(rows)
+    tested = slice(train_size, len(data))
+    strategy_returns = predictions[tested] * next_return[tested]
+    equity = pd.Series(np.cumprod(1 + strategy_returns), index=data.index[tested], name="Equity")
+
+    total_seconds = time.perf_counter() - start_time
+    timings = {
+        "windows": len(windows),
+        "total_seconds": total_seconds,
+        "fit_seconds": fit_seconds,
+        "ms_per_window": 1000 * total_seconds / max(len(windows), 1),
+    }
+    return windows, equity, timings
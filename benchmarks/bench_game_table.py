@@ -0,0 +1,83 @@
+# Compare memory and ranking time of the old per-game tuple list with the columnar GameTable
+#
+# Usage: python benchmarks/bench_game_table.py [number_of_games]
+
+import pathlib
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from steam_table import GameTable
+
+
+def fake_catalog(n):
+    """Yield (appid, game) pairs shaped like the SteamSpy request=all payload."""
+    rng = random.Random(42)
+    ranges = [(0, 20_000), (20_000, 50_000), (1_000_000, 2_000_000), (50_000_000, 100_000_000)]
+    for appid in range(10, 10 + n):
+        yield str(appid), {
+            "appid": appid,
+            "name": f"Game {appid}",
+            "owners": "{:,} .. {:,}".format(*rng.choice(ranges)),
+            "average_forever": rng.randint(0, 5000),
+            "median_forever": rng.randint(0, 5000),
+            "ccu": rng.randint(0, 100000),
+        }
+
+
+def build_tuples(items):
+    # the original game_stats_tracker.py representation
+    game_data = []
+    for appid, game in items:
+        try:
+            name = game.get("name", "Unknown")
+            owners = game.get("owners", "Unknown")
+            avg_playtime = int(game.get("average_forever", 0))
+            if avg_playtime > 0:
+                game_data.append((name, owners, avg_playtime))
+        except Exception:
+            continue
+    return game_data
+
+
+def measure(build, n):
+    # games are generated lazily, so the peak only counts what the builder holds (plus one game)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(fake_catalog(n))
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, peak, elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    tuples, tuple_bytes, tuple_peak, tuple_build = measure(build_tuples, n)
+    table, table_bytes, table_peak, table_build = measure(GameTable.from_items, n)
+
+    start = time.perf_counter()
+    sorted(tuples, key=lambda x: x[2], reverse=True)[:100]
+    tuple_rank = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table.ranking("average_forever", 100)
+    table_rank = time.perf_counter() - start
+
+    print(f"{n:,} games")
+    print(f"{'':<14}{'bytes/game':>12}{'peak/game':>12}{'build (s)':>12}{'top 100 (ms)':>14}")
+    for label, retained, peak, build, rank in [
+        ("tuple list", tuple_bytes, tuple_peak, tuple_build, tuple_rank),
+        ("GameTable", table_bytes, table_peak, table_build, table_rank),
+    ]:
+        print(f"{label:<14}{retained / n:>12.1f}{peak / n:>12.1f}{build:>12.3f}{rank * 1000:>14.2f}")
+    print(f"GameTable.nbytes(): {table.nbytes() / n:.1f} bytes/game, "
+          f"of which numeric columns {sum(c.nbytes for c in table.columns.values()) / n:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Compare load time and memory of a plain pd.read_csv with the typed load_csv, cold and with its Feather cache
+#
+# Usage: python benchmarks/bench_load_expenses.py [rows]   (default 1,000,000)
+
+import pathlib
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from expense_tracker import load_csv
+
+
+CATEGORIES = ["Food", "Rent", "Transport", "Utilities", "Entertainment", "Health", "Shopping", "Other"]
+
+
+def fake_expenses(rows):
+    rng = np.random.default_rng(0)
+    dates = pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3650, rows), unit="D")
+    return pd.DataFrame({
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Category": rng.choice(CATEGORIES, rows),
+        "Amount": rng.integers(100, 50_000, rows) / 100,
+        "Note": rng.choice(["", "lunch", "monthly", "card", "cash"], rows),
+    })
+
+
+def timed(load):
+    start = time.perf_counter()
+    expenses = load()
+    return time.perf_counter() - start, expenses.memory_usage(deep=True).sum()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(pathlib.Path(tmp) / "expenses.csv")
+        fake_expenses(rows).to_csv(path, index=False)
+        print(f"{rows:,} rows, {pathlib.Path(path).stat().st_size / 1e6:.1f} MB CSV")
+
+        results = [
+            ("read_csv (old)", timed(lambda: pd.read_csv(path))),
+            ("load_csv cold", timed(lambda: load_csv(path))),
+            ("load_csv cached", timed(lambda: load_csv(path))),
+        ]
+        for name, (seconds, nbytes) in results:
+            print(f"{name:<18}{seconds * 1000:>9.0f} ms{nbytes / 1e6:>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
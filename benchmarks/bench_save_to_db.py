@@ -0,0 +1,59 @@
+# Compare rows/sec of the old to_sql(if_exists="replace") path with the bulk save_to_db
+#
+# Usage: python benchmarks/bench_save_to_db.py [tickers] [days]   (default 400 x 5000 = 2M rows)
+
+import pathlib
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from stock_prediction import get_engine, save_to_db
+
+
+def fake_processed(tickers, days):
+    """A (Date, Ticker) frame shaped like preprocess_many() output."""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2000-01-03", periods=days)
+    index = pd.MultiIndex.from_product([dates, [f"T{i:04d}" for i in range(tickers)]], names=["Date", "Ticker"])
+    n = len(index)
+    close = 100 * np.exp(rng.normal(0, 0.01, n).cumsum() / 100)
+    return pd.DataFrame({
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": rng.integers(1_000_000, 10_000_000, n),
+        "Return": rng.normal(0, 0.01, n),
+        "SMA_10": close, "SMA_50": close,
+        "Target": rng.integers(0, 2, n),
+    }, index=index)
+
+
+def main():
+    tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    data = fake_processed(tickers, days)
+    print(f"{len(data):,} rows ({tickers} tickers x {days} days)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = pathlib.Path(tmp) / "old.db"
+        start = time.perf_counter()
+        data.to_sql("bench", create_engine(f"sqlite:///{old_path}"), if_exists="replace", index=True)
+        old = time.perf_counter() - start
+
+        new_path = pathlib.Path(tmp) / "new.db"
+        start = time.perf_counter()
+        save_to_db(data, "bench", url=f"sqlite:///{new_path}")
+        new = time.perf_counter() - start
+        # closing the pool checkpoints the WAL file back into the database
+        get_engine(f"sqlite:///{new_path}").dispose()
+
+        print(f"{'to_sql (old)':<16}{len(data) / old:>12,.0f} rows/s{old:>9.1f}s{old_path.stat().st_size / 1e6:>9.1f} MB")
+        print(f"{'save_to_db':<16}{len(data) / new:>12,.0f} rows/s{new:>9.1f}s{new_path.stat().st_size / 1e6:>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
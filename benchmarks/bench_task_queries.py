@@ -0,0 +1,76 @@
+# Time listing the first page of pending tasks: old SELECT * + fetchall vs the indexed keyset query
+#
+# Usage: python benchmarks/bench_task_queries.py [tasks]   (default 1,000,000)
+
+import os
+import pathlib
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import task_manager
+
+STATUSES = ["Pending", "In Progress", "Done"]
+
+
+def seed(path, tasks):
+    rng = random.Random(0)
+    start = date(2024, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, "
+        "description TEXT, due_date TEXT, status TEXT DEFAULT 'Pending')"
+    )
+    conn.executemany(
+        "INSERT INTO tasks (title, description, due_date, status) VALUES (?, ?, ?, ?)",
+        ((f"task {i}", "benchmark", (start + timedelta(days=rng.randrange(730))).isoformat(),
+          rng.choice(STATUSES)) for i in range(tasks)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def main():
+    tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tasks.db")
+        seed(path, tasks)
+        print(f"{tasks:,} tasks")
+
+        conn = sqlite3.connect(path)
+        start = time.perf_counter()
+        rows = conn.execute("SELECT * FROM tasks").fetchall()
+        pending = [row for row in rows if row[4] == "Pending"][:task_manager.PAGE_SIZE]
+        old = time.perf_counter() - start
+        conn.close()
+
+        task_manager.DB_NAME = path
+        start = time.perf_counter()
+        task_manager.init_db()
+        migrate = time.perf_counter() - start
+
+        start = time.perf_counter()
+        page = task_manager.fetch_page(status="Pending")
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        page = task_manager.fetch_page(status="Pending", after=(page[-1].due_date, page[-1].id))
+        second = time.perf_counter() - start
+        start = time.perf_counter()
+        overdue = sum(1 for _ in zip(range(1000), task_manager.overdue_tasks(date(2025, 1, 1))))
+        views = time.perf_counter() - start
+
+        print(f"{'SELECT * (old)':<24}{old * 1000:>10.1f} ms  ({len(pending)} rows)")
+        print(f"{'migrate + index':<24}{migrate * 1000:>10.1f} ms  (once)")
+        print(f"{'first pending page':<24}{first * 1000:>10.2f} ms")
+        print(f"{'next pending page':<24}{second * 1000:>10.2f} ms")
+        print(f"{'1000 overdue tasks':<24}{views * 1000:>10.2f} ms  ({overdue} rows)")
+        task_manager.get_db().close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Compare updates/sec of the old connect-per-call task_manager with single, batched and queued writes
+#
+# Usage: python benchmarks/bench_task_updates.py [updates]   (default 2000)
+
+import os
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import task_manager
+
+
+def old_update_task(task_id, new_status):
+    """update_task() as it was: a fresh connection and commit per call."""
+    conn = sqlite3.connect(task_manager.DB_NAME)
+    cursor = conn.cursor()
+    cursor.execute("UPDATE tasks SET status=? WHERE id=?", (new_status, task_id))
+    conn.commit()
+    conn.close()
+
+
+def seed(path, tasks):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, "
+        "description TEXT, due_date TEXT, status TEXT DEFAULT 'Pending')"
+    )
+    conn.executemany(
+        "INSERT INTO tasks (title, description, due_date) VALUES (?, ?, ?)",
+        ((f"task {i}", "benchmark", "2025-01-01") for i in range(tasks)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def timed(path, run, updates):
+    task_manager.DB_NAME = path
+    start = time.perf_counter()
+    run(updates)
+    seconds = time.perf_counter() - start
+    task_manager.get_db().close()
+    return seconds
+
+
+def main():
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    def old(n):
+        for i in range(n):
+            old_update_task(i + 1, "Done")
+
+    def per_call(n):
+        for i in range(n):
+            task_manager.update_task(i + 1, "Done", verbose=False)
+
+    def one_transaction(n):
+        with task_manager.transaction():
+            for i in range(n):
+                task_manager.update_task(i + 1, "Done", verbose=False)
+
+    def batched(n):
+        task_manager.update_tasks(range(1, n + 1), "Done", verbose=False)
+
+    def queued(n):
+        writes = task_manager.WriteBehindQueue()
+        for i in range(n):
+            writes.update_task(i + 1, "Done")
+        writes.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{updates:,} status updates")
+        for name, run in [
+            ("connect per call", old),
+            ("persistent", per_call),
+            ("one transaction", one_transaction),
+            ("update_tasks", batched),
+            ("write-behind queue", queued),
+        ]:
+            path = os.path.join(tmp, name.replace(" ", "_") + ".db")
+            seed(path, updates)
+            seconds = timed(path, run, updates)
+            print(f"{name:<20}{updates / seconds:>12,.0f} updates/s{seconds:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# Drive a local task_server with many concurrent keep-alive clients and report throughput and latency
+#
+# Usage: python benchmarks/load_test_task_server.py [clients] [requests_per_client] [tasks]
+#        (default 50 clients x 200 requests against 100,000 seeded tasks)
+#
+# The mix is 70% pending-task pages, 10% searches, 15% status updates and 5% new tasks.
+
+import asyncio
+import json
+import os
+import pathlib
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import task_manager
+
+PORT = 8799
+WORDS = ["report", "invoice", "deploy", "review", "budget", "meeting", "client", "release", "backup", "audit"]
+
+
+def random_words(rng, k):
+    # 10,000 distinct words, so a search matches a realistic fraction of the tasks
+    return [f"{rng.choice(WORDS)}{rng.randrange(1000)}" for _ in range(k)]
+
+
+def seed(path, tasks):
+    rng = random.Random(0)
+    task_manager.DB_NAME = path
+    task_manager.init_db()
+    task_manager.add_tasks(
+        ((f"{rng.choice(WORDS)} {i}", " ".join(random_words(rng, 6)),
+          f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}") for i in range(tasks)),
+        verbose=False,
+    )
+    task_manager.get_db().close()
+
+
+async def request(reader, writer, method, target, body=None):
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(seed_id, requests, tasks, latencies, errors):
+    rng = random.Random(seed_id)
+    reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+    for _ in range(requests):
+        roll = rng.random()
+        if roll < 0.70:
+            call = ("GET", f"/tasks?status=Pending&due_from=2025-{rng.randint(1, 12):02d}-01&limit=50", None)
+        elif roll < 0.80:
+            call = ("GET", f"/search?q={random_words(rng, 1)[0][:-1]}", None)
+        elif roll < 0.95:
+            call = ("PATCH", f"/tasks/{rng.randint(1, tasks)}", {"status": rng.choice(["Pending", "In Progress", "Done"])})
+        else:
+            call = ("POST", "/tasks", {"title": "load test", "description": " ".join(random_words(rng, 6)), "due_date": "2025-06-01"})
+        start = time.perf_counter()
+        status, _ = await request(reader, writer, *call)
+        latencies.append(time.perf_counter() - start)
+        if status >= 400:
+            errors.append(status)
+    writer.close()
+
+
+async def run(clients, requests, tasks):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i, requests, tasks, latencies, errors) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+    _, server_metrics = await request(reader, writer, "GET", "/metrics")
+    writer.close()
+
+    ms = np.array(latencies) * 1000
+    print(f"{len(latencies):,} requests from {clients} clients in {elapsed:.2f}s: "
+          f"{len(latencies) / elapsed:,.0f} req/s, {len(errors)} errors")
+    print(f"client latency  p50 {np.percentile(ms, 50):.2f} ms  p99 {np.percentile(ms, 99):.2f} ms  max {ms.max():.2f} ms")
+    print("server latency by route:")
+    for route, stats in server_metrics.items():
+        print(f"  {route:<20}{stats['requests']:>8,}  p50 {stats['p50_ms']:6.2f} ms  p99 {stats['p99_ms']:6.2f} ms")
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    tasks = int(sys.argv[3]) if len(sys.argv) > 3 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tasks.db")
+        seed(path, tasks)
+        server = subprocess.Popen([sys.executable, str(ROOT / "task_server.py"), str(PORT), path],
+                                  stdout=subprocess.PIPE, text=True)
+        try:
+            server.stdout.readline()  # "Serving ..." once it is listening
+            asyncio.run(run(clients, requests, tasks))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,11 +11,17 @@ import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from http_cache import HTTPCache
+
+
+# downloaded datasets are kept on disk so repeat runs skip the download
+cache = HTTPCache(ttl=7 * 24 * 60 * 60)
+
 
 # load CSV safely
 def safe_read_csv(url):
     try:
-        return pd.read_csv(url)
+        return pd.read_csv(cache.fetch(url))
     except:
         print("Error loading data")
         sys.exit(1)
@@ -43,6 +49,7 @@ def main():
 
     vgsales = safe_read_csv(vgsales_url)
     scores = safe_read_csv(scores_url)
+    print(cache.summary())
 
     # clean column names
     vgsales = normalize_columns(vgsales)
@@ -1,26 +1,388 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+import numpy as np
+import atexit
+import collections
+import csv
+import json
 import os
+import sys
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
 
 FILE_NAME = "expenses.csv"
+JOURNAL_NAME = "expenses.journal"
+AGGREGATES_NAME = "expenses.aggregates.json"
+COLUMNS = ["Date", "Category", "Amount", "Note"]
+# Amount stays float64: compaction writes the frame back to the CSV, and float32
+# cannot hold every amount to the cent
+DTYPES = {"Category": "category", "Amount": "float64", "Note": "string"}
+COMPACT_EVERY = 1000
+IMPORT_CHUNK_SIZE = 50_000
+
+
+def _fsync_write(path, write):
+    """Write a file with write(f), flushing it to disk before returning."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _typed(expenses: pd.DataFrame) -> pd.DataFrame:
+    """Apply the ledger's explicit column types."""
+    expenses = expenses.astype(DTYPES)
+    expenses["Date"] = pd.to_datetime(expenses["Date"])
+    return expenses
+
+
+def load_csv(file_name=FILE_NAME) -> pd.DataFrame:
+    """Read the expenses CSV with explicit dtypes.
+
+    With pyarrow installed the CSV is parsed by the pyarrow engine and a copy
+    is kept in <file>.feather. As long as the CSV's mtime and size and
+    DTYPES are unchanged, later loads memory-map that Feather file instead
+    of parsing the CSV again.
+    """
+    if not os.path.exists(file_name):
+        return _typed(pd.DataFrame(columns=COLUMNS))
+    if pa is None:
+        return _typed(pd.read_csv(file_name, dtype=DTYPES))
+
+    stat = os.stat(file_name)
+    stamp = {
+        b"csv_mtime_ns": str(stat.st_mtime_ns).encode(),
+        b"csv_size": str(stat.st_size).encode(),
+        b"dtypes": json.dumps(DTYPES).encode(),
+    }
+    cache = file_name + ".feather"
+    try:
+        table = feather.read_table(cache, memory_map=True)
+        metadata = table.schema.metadata or {}
+        if all(metadata.get(k) == v for k, v in stamp.items()):
+            return table.to_pandas()
+    except (FileNotFoundError, pa.ArrowInvalid):
+        pass
+
+    expenses = _typed(pd.read_csv(file_name, engine="pyarrow", dtype=DTYPES))
+    table = pa.Table.from_pandas(expenses, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **stamp})
+    # uncompressed so the file can be memory-mapped without decoding
+    feather.write_feather(table, cache + ".tmp", compression="uncompressed")
+    os.replace(cache + ".tmp", cache)
+    return expenses
+
+
+def content_hashes(expenses: pd.DataFrame) -> np.ndarray:
+    """64-bit hash of every row's (date, category, amount to the cent, note)."""
+    canonical = pd.DataFrame({
+        "Date": pd.to_datetime(expenses["Date"]).dt.strftime("%Y-%m-%d"),
+        "Category": expenses["Category"].astype(str),
+        "Amount": expenses["Amount"].astype("float64").map("{:.2f}".format),
+        "Note": expenses["Note"].astype("string").fillna(""),
+    })
+    return pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+
+
+class ExpenseJournal:
+    """Expense ledger stored as a CSV base file plus an append-only journal.
+
+    Adding an expense appends one line to the journal instead of rewriting
+    expenses.csv, so it costs the same whatever the ledger size. Rows are
+    buffered in memory and written with fsync every `flush_every` rows (and
+    at exit). Once the journal holds COMPACT_EVERY rows it is folded back
+    into expenses.csv.
+
+    Compaction is crash safe: the journal is first renamed to
+    <journal>.compacting, the merged CSV is written to <file>.new, the old
+    journal is removed and only then <file>.new replaces the CSV. Opening a
+    ledger finishes whatever step was interrupted.
+
+    Running totals per category and per month are kept up to date on every
+    append and saved to AGGREGATES_NAME, so summaries never scan the ledger.
+    The saved totals record how many rows they cover; if that does not
+    match the ledger (e.g. after a crash) they are rebuilt from scratch.
+    """
+
+    def __init__(self, file_name=FILE_NAME, journal_name=JOURNAL_NAME, flush_every=1,
+                 aggregates_name=AGGREGATES_NAME):
+        self.file_name = file_name
+        self.journal_name = journal_name
+        self.aggregates_name = aggregates_name
+        self.flush_every = flush_every
+        self._recover()
+
+        self._frame = load_csv(file_name)
+        self.rows, end = self._read_journal(journal_name)
+        self._truncate_journal(end)
+        self.buffer = []
+        self._framed_rows = 0
+        self._date_index = None
+        self._load_aggregates()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _read_journal(path):
+        """Return the journal's rows and the byte offset just past the last complete one."""
+        if not os.path.exists(path):
+            return [], 0
+        rows = []
+        offset = end = 0
+        line = b""
+
+        def lines(f):
+            nonlocal offset, line
+            for line in f:
+                offset += len(line)
+                yield line.decode("utf-8", errors="replace")
+
+        with open(path, "rb") as f:
+            for record in csv.reader(lines(f)):
+                # a torn last line from a crash mid-write is skipped
+                if len(record) != len(COLUMNS) or not line.endswith(b"\n"):
+                    continue
+                try:
+                    amount = float(record[2])
+                except ValueError:
+                    continue
+                rows.append({"Date": record[0], "Category": record[1], "Amount": amount, "Note": record[3]})
+                end = offset
+        return rows, end
+
+    def _truncate_journal(self, end):
+        """Cut anything after the last complete row off the journal.
+
+        Otherwise the next flush would append its first row onto a torn line
+        and that row would be unreadable on the next open.
+        """
+        if os.path.exists(self.journal_name) and os.path.getsize(self.journal_name) > end:
+            with open(self.journal_name, "r+b") as f:
+                f.truncate(end)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _recover(self):
+        compacting = self.journal_name + ".compacting"
+        new_file = self.file_name + ".new"
+        if os.path.exists(compacting):
+            # merged file may be incomplete, so merge again from the start
+            if os.path.exists(new_file):
+                os.remove(new_file)
+            self._merge(compacting, new_file)
+            os.remove(compacting)
+        if os.path.exists(new_file):
+            os.replace(new_file, self.file_name)
+
+    def _merge(self, journal, new_file):
+        journal_rows = _typed(pd.DataFrame(self._read_journal(journal)[0], columns=COLUMNS))
+        merged = pd.concat([load_csv(self.file_name), journal_rows], ignore_index=True)
+        _fsync_write(new_file, lambda f: merged.to_csv(f, index=False))
+
+    def _load_aggregates(self):
+        try:
+            with open(self.aggregates_name, encoding="utf-8") as f:
+                self.aggregates = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.aggregates = None
+        if self.aggregates is None or self.aggregates["rows"] != len(self._frame) + len(self.rows):
+            self.rebuild_aggregates()
+
+    def rebuild_aggregates(self):
+        """Recompute the category and month totals from the full ledger."""
+        expenses = self.to_frame()
+        amounts = expenses["Amount"].round(2)
+        months = expenses["Date"].dt.strftime("%Y-%m")
+        self.aggregates = {
+            "rows": len(expenses),
+            "category": {str(k): round(v, 2) for k, v in amounts.groupby(expenses["Category"], observed=True).sum().items()},
+            "month": {str(k): round(v, 2) for k, v in amounts.groupby(months).sum().items()},
+        }
+        self._save_aggregates()
+
+    def _save_aggregates(self):
+        tmp = self.aggregates_name + ".tmp"
+        _fsync_write(tmp, lambda f: json.dump(self.aggregates, f))
+        os.replace(tmp, self.aggregates_name)
+
+    def category_totals(self):
+        totals = pd.Series(self.aggregates["category"], name="Amount", dtype=float)
+        return totals.rename_axis("Category").sort_index()
+
+    def month_totals(self):
+        totals = pd.Series(self.aggregates["month"], name="Amount", dtype=float)
+        return totals.rename_axis("Month").sort_index()
+
+    def append(self, row):
+        self.rows.append(row)
+        self.buffer.append(row)
+        self._count(row)
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def extend(self, rows):
+        """Append many rows with a single journal write and fsync."""
+        self.rows.extend(rows)
+        self.buffer.extend(rows)
+        for row in rows:
+            self._count(row)
+        self.flush()
+
+    def _count(self, row):
+        # amounts and totals are rounded to the cent, as in rebuild_aggregates, so
+        # both paths give the same float whatever the order of the additions
+        totals = self.aggregates
+        amount = round(float(row["Amount"]), 2)
+        month = row["Date"][:7]
+        totals["rows"] += 1
+        totals["category"][row["Category"]] = round(totals["category"].get(row["Category"], 0.0) + amount, 2)
+        totals["month"][month] = round(totals["month"].get(month, 0.0) + amount, 2)
+
+    def flush(self):
+        """Append buffered rows to the journal and fsync it."""
+        if not self.buffer:
+            return
+        with open(self.journal_name, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            for row in self.buffer:
+                writer.writerow([row[col] for col in COLUMNS])
+            f.flush()
+            os.fsync(f.fileno())
+        self.buffer.clear()
+        self._save_aggregates()
+        if len(self.rows) >= COMPACT_EVERY:
+            self.compact()
+
+    def compact(self):
+        """Fold the journal into the CSV base file."""
+        self.flush()
+        if not os.path.exists(self.journal_name):
+            return
+        compacting = self.journal_name + ".compacting"
+        new_file = self.file_name + ".new"
+        os.replace(self.journal_name, compacting)
+        self._merge(compacting, new_file)
+        os.remove(compacting)
+        os.replace(new_file, self.file_name)
+
+        self._frame = self.to_frame()
+        self.rows = []
+        self._framed_rows = 0
+
+    def to_frame(self):
+        """Return all expenses as a DataFrame, only concatenating rows added since the last call."""
+        if self._framed_rows < len(self.rows):
+            new_rows = _typed(pd.DataFrame(self.rows[self._framed_rows:], columns=COLUMNS))
+            frame = pd.concat([self._frame, new_rows], ignore_index=True)
+            # concat falls back to object when the category sets differ
+            self._frame = frame.astype({"Category": "category"})
+            self._framed_rows = len(self.rows)
+        return self._frame
+
+    def _sorted_dates(self):
+        """Row order by date and the dates in that order, kept in step with to_frame()."""
+        frame = self.to_frame()
+        dates = frame["Date"].to_numpy("datetime64[ns]")
+        if self._date_index is not None:
+            order, sorted_dates = self._date_index
+            if len(order) == len(frame):
+                return order, sorted_dates
+            new = dates[len(order):]
+            # rows are mostly added in date order, so new rows usually just go on the end
+            if len(order) < len(frame) and (len(order) == 0 or new.min() >= sorted_dates[-1]):
+                new_order = len(order) + np.argsort(new, kind="stable")
+                order = np.concatenate([order, new_order])
+                self._date_index = order, np.concatenate([sorted_dates, dates[new_order]])
+                return self._date_index
+        order = np.argsort(dates, kind="stable")
+        self._date_index = order, dates[order]
+        return self._date_index
+
+    def query(self, start=None, end=None, category=None) -> pd.DataFrame:
+        """Return expenses dated in [start, end), optionally of one category, in date order.
+
+        The date bounds are found by binary search on a sorted date index
+        instead of scanning the whole ledger.
+        """
+        order, sorted_dates = self._sorted_dates()
+        lo = 0 if start is None else np.searchsorted(sorted_dates, np.datetime64(start, "ns"), side="left")
+        hi = len(order) if end is None else np.searchsorted(sorted_dates, np.datetime64(end, "ns"), side="left")
+        rows = self._frame.iloc[order[lo:hi]]
+        if category is not None:
+            rows = rows[rows["Category"] == category]
+        return rows
+
+    def import_csv(self, path, columns=None, chunksize=IMPORT_CHUNK_SIZE):
+        """Bulk-import a CSV export (e.g. from a bank) in streaming chunks.
+
+        `columns` maps the export's column names to Date/Category/Amount/Note;
+        Note may be missing. A ValueError naming the missing columns is
+        raised before anything is imported if Date, Category or Amount
+        cannot be found. Rows with an unparsable date or amount or an
+        empty category are skipped. A row whose content hash is already in
+        the ledger is skipped as a duplicate, but only as many times as it
+        occurs there, so importing the same file twice adds nothing while
+        genuinely repeated rows within one export are kept.
+
+        Returns counts of rows read, imported, duplicate and invalid.
+        """
+        seen = collections.Counter(content_hashes(self.to_frame()))
+        in_file = collections.Counter()
+        stats = {"rows": 0, "imported": 0, "duplicates": 0, "invalid": 0}
+
+        for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize):
+            if columns:
+                chunk = chunk.rename(columns=columns)
+            missing = [col for col in COLUMNS[:3] if col not in chunk]
+            if missing:
+                raise ValueError(
+                    f"{path}: missing column(s) {', '.join(missing)} (found {', '.join(map(repr, chunk.columns))}); "
+                    f"map the export's columns, e.g. --map 'Booking date=Date,Value=Amount'"
+                )
+            if "Note" not in chunk:
+                chunk["Note"] = ""
+            stats["rows"] += len(chunk)
+
+            dates = pd.to_datetime(chunk["Date"], errors="coerce")
+            amounts = pd.to_numeric(chunk["Amount"], errors="coerce").round(2)
+            categories = chunk["Category"].str.strip()
+            valid = dates.notna() & np.isfinite(amounts) & (categories != "")
+            stats["invalid"] += int((~valid).sum())
+
+            chunk = pd.DataFrame({
+                "Date": dates[valid].dt.strftime("%Y-%m-%d"),
+                "Category": categories[valid],
+                "Amount": amounts[valid],
+                "Note": chunk["Note"][valid],
+            })
+            rows = []
+            for key, row in zip(content_hashes(chunk), chunk.to_dict("records")):
+                in_file[key] += 1
+                if in_file[key] > seen[key]:
+                    rows.append(row)
+            stats["duplicates"] += len(chunk) - len(rows)
+            if rows:
+                self.extend(rows)
+                stats["imported"] += len(rows)
+        return stats
 
 
 def load_expenses():
-    """Load expenses from CSV file or create an empty DataFrame."""
-    if os.path.exists(FILE_NAME):
-        return pd.read_csv(FILE_NAME)
-    else:
-        return pd.DataFrame(columns=["Date", "Category", "Amount", "Note"])
+    """Open the expense ledger (CSV file plus journal)."""
+    return ExpenseJournal()
 
 
-def save_expenses(expenses: pd.DataFrame):
-    """Save expenses to CSV file."""
-    expenses.to_csv(FILE_NAME, index=False)
+def save_expenses(expenses: ExpenseJournal):
+    """Make sure every added expense is on disk."""
+    expenses.flush()
 
 
-def add_expense(expenses: pd.DataFrame, category: str, amount: float, note: str):
+def add_expense(expenses: ExpenseJournal, category: str, amount: float, note: str):
     """Add a new expense entry."""
     new_expense = {
         "Date": datetime.today().strftime("%Y-%m-%d"),
@@ -28,38 +390,86 @@ def add_expense(expenses: pd.DataFrame, category: str, amount: float, note: str)
         "Amount": amount,
         "Note": note,
     }
-    expenses = pd.concat([expenses, pd.DataFrame([new_expense])], ignore_index=True)
-    save_expenses(expenses)
+    expenses.append(new_expense)
     print("Expense added successfully!")
     return expenses
 
 
-def view_summary(expenses: pd.DataFrame):
-    """View summary of expenses by category."""
-    if expenses.empty:
+def view_summary(expenses: ExpenseJournal):
+    """View summary of expenses by category and by month."""
+    if expenses.aggregates["rows"] == 0:
         print("No expenses recorded yet.")
         return
-    summary = expenses.groupby("Category")["Amount"].sum()
     print("\n=== Expense Summary ===")
-    print(summary)
+    print(expenses.category_totals())
+    print("\n--- By Month ---")
+    print(expenses.month_totals())
     print("=======================")
 
 
-def plot_expenses(expenses: pd.DataFrame):
+def plot_expenses(expenses: ExpenseJournal):
     """Plot expenses by category as a pie chart."""
-    if expenses.empty:
+    if expenses.aggregates["rows"] == 0:
         print("No expenses to plot.")
         return
-    summary = expenses.groupby("Category")["Amount"].sum()
+    summary = expenses.category_totals()
     summary.plot(kind="pie", autopct="%1.1f%%", figsize=(6, 6))
     plt.title("Expenses by Category")
     plt.ylabel("")
     plt.show()
 
 
+def parse_column_map(spec):
+    """Parse "Export column=Ledger column,..." into an import_csv columns mapping."""
+    columns = {}
+    for pair in spec.split(","):
+        source, sep, target = pair.partition("=")
+        if not sep or target.strip() not in COLUMNS:
+            raise ValueError(f"Bad column mapping {pair!r}: expected EXPORT_COLUMN=one of {'/'.join(COLUMNS)}")
+        columns[source.strip()] = target.strip()
+    return columns
+
+
+def import_files(expenses: ExpenseJournal, paths, columns=None):
+    """Import each CSV file into the ledger and report what was added."""
+    for path in paths:
+        try:
+            stats = expenses.import_csv(path, columns)
+        except ValueError as e:
+            print(e)
+            continue
+        print(f"{path}: {stats['imported']} imported, {stats['duplicates']} duplicates, "
+              f"{stats['invalid']} invalid of {stats['rows']} rows")
+
+
+def query_expenses(expenses: ExpenseJournal, start=None, end=None, category=None):
+    """Print the expenses in [start, end) (and category) with their total."""
+    rows = expenses.query(start, end, category)
+    if rows.empty:
+        print("No matching expenses.")
+        return
+    print(rows.to_string(index=False, float_format="{:.2f}".format))
+    print(f"\nTotal: {rows['Amount'].sum():.2f} over {len(rows)} expenses")
+
+
 def main():
     expenses = load_expenses()
 
+    # non-interactive use:
+    #   expense_tracker.py --import [--map 'Booking date=Date,Value=Amount,...'] export.csv [...]
+    #   expense_tracker.py --query START|- END|- [CATEGORY]
+    if len(sys.argv) > 1 and sys.argv[1] == "--import":
+        paths, columns = sys.argv[2:], None
+        if paths[:1] == ["--map"]:
+            columns = parse_column_map(paths[1])
+            paths = paths[2:]
+        import_files(expenses, paths, columns)
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "--query":
+        start, end, category = ([None if arg == "-" else arg for arg in sys.argv[2:5]] + [None] * 3)[:3]
+        query_expenses(expenses, start, end, category)
+        return
+
     while True:
         print("\n=== Personal Expense Tracker ===")
         print("1. Add Expense")
@@ -82,6 +492,7 @@ def main():
             plot_expenses(expenses)
 
         elif choice == "4":
+            save_expenses(expenses)
             print("Goodbye!")
             break
 
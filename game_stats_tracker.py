@@ -1,44 +1,197 @@
 # API used: https://steamspy.com/api.php
 # This script extracts data for all Steam games, ranks them by average playtime, and saves the result in a txt file
+#
+# Usage:
+#   python game_stats_tracker.py                 # stream from the live SteamSpy endpoint (cached on disk)
+#   python game_stats_tracker.py payload.json    # stream from a recorded request=all payload
+#   python game_stats_tracker.py --pages [dir]   # fetch request=all&page=N pages concurrently,
+#                                                # checkpointing pages in dir so a refresh can resume
+#   python game_stats_tracker.py --diff          # only re-diff the two most recent snapshots
+#
+# Every run also saves a snapshot of the rankings to steam_snapshots/ and writes the rank
+# movements, new entries and dropouts against the previous snapshot to steam_top100_changes.txt
 
-import requests
+import json
 import pathlib
+import sys
 
+from http_cache import HTTPCache
+import steam_snapshots
+from steam_table import GameTable
+from steamspy_fetcher import SteamSpyFetcher
 
-url = "https://steamspy.com/api.php?request=all"
-response = requests.get(url)
-data = response.json()  
 
+URL = "https://steamspy.com/api.php?request=all"
+CHUNK_SIZE = 64 * 1024
+TOP_N = 100
 
-game_data = []
-for appid, game in data.items():
-    try:
-        name = game.get("name", "Unknown")
-        owners = game.get("owners", "Unknown")
-        avg_playtime = int(game.get("average_forever", 0))
-        if avg_playtime > 0:
-            game_data.append((name, owners, avg_playtime))
-    except Exception: 
-        continue
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
 
-# Rank the games by average playtime 
-game_data_sorted = sorted(game_data, key=lambda x: x[2], reverse=True)
 
-# Save only the top 100 games to CSV (Rank, Name, Average_Playtime)
-output_file = pathlib.Path.cwd() / "steam_top100_summary.csv"
-with output_file.open("w", encoding="utf-8") as f:
-    f.write("Rank,Name,Average_Playtime(min)\n")
-    for idx, game in enumerate(game_data_sorted[:100], start=1):
-        f.write(f"{idx},{game[0]},{game[2]}\n")
+def chunks_from_file(path, chunk_size=CHUNK_SIZE):
+    """Yield text chunks of a recorded payload file."""
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
 
-# Save the top 100 games into a txt file
-txt_output = pathlib.Path.cwd() / "steam_top100_summary.txt"
-with txt_output.open("w", encoding="utf-8") as f:
-    f.write("Top 100 Steam Games by Average Playtime\n")
-    f.write("----------------------------------------\n")
-    for idx, game in enumerate(game_data_sorted[:100], start=1):
-        f.write(f"{idx}. {game[0]}: {game[2]} minutes\n")
 
-print("Top 100 games by average playtime written to steam_top100_summary.csv and steam_top100_summary.txt")
+def iter_app_objects(chunks):
+    """Incrementally parse a top level {"appid": {...}, ...} JSON object.
 
+    Only one app entry (plus whatever is left of the current chunk) is kept in
+    memory at a time, so the whole catalog is never materialized.
+    """
+    chunks = iter(chunks)
+    buf = ""
+    pos = 0
+    state = "start"
 
+    while True:
+        # skip whitespace, then try to make progress on the buffer
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+
+        progressed = False
+        if pos < len(buf):
+            if state == "start":
+                if buf[pos] != "{":
+                    raise ValueError("Expected a JSON object at the top level")
+                pos += 1
+                state = "key"
+                progressed = True
+            elif state == "key":
+                if buf[pos] == "}":
+                    return
+                try:
+                    key, end = _decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    pass
+                else:
+                    pos, state, progressed = end, "colon", True
+            elif state == "colon":
+                if buf[pos] != ":":
+                    raise ValueError(f"Expected ':' after key {key!r}")
+                pos += 1
+                state = "value"
+                progressed = True
+            elif state == "value":
+                try:
+                    value, end = _decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    pass
+                else:
+                    yield key, value
+                    pos, state, progressed = end, "separator", True
+            elif state == "separator":
+                if buf[pos] == "}":
+                    return
+                if buf[pos] != ",":
+                    raise ValueError("Expected ',' or '}' between entries")
+                pos += 1
+                state = "key"
+                progressed = True
+
+        if progressed:
+            continue
+
+        # need more data: drop what was consumed and pull the next chunk
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            raise ValueError("Unexpected end of JSON payload") from None
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+def iter_games(chunks):
+    """Yield (appid, name, owners, avg_playtime) records as they are parsed."""
+    for appid, game in iter_app_objects(chunks):
+        try:
+            name = game.get("name", "Unknown")
+            owners = game.get("owners", "Unknown")
+            avg_playtime = int(game.get("average_forever", 0))
+        except Exception:
+            continue
+        yield appid, name, owners, avg_playtime
+
+
+def write_ranking_csv(path, ranked, score_label):
+    with path.open("w", encoding="utf-8") as f:
+        f.write(f"Rank,Name,{score_label}\n")
+        for idx, (score, appid, name) in enumerate(ranked, start=1):
+            f.write(f"{idx},{name},{score}\n")
+
+
+def report_changes(previous_path, current_path):
+    """Diff two snapshots and write the changes report."""
+    diffs = steam_snapshots.diff_snapshots(
+        steam_snapshots.load_snapshot(previous_path),
+        steam_snapshots.load_snapshot(current_path),
+    )
+    steam_snapshots.write_diff_report(pathlib.Path.cwd() / "steam_top100_changes.txt", diffs, previous_path)
+    print(f"Ranking changes since {previous_path.stem} written to steam_top100_changes.txt")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--diff":
+        current = steam_snapshots.latest_snapshot()
+        previous = steam_snapshots.latest_snapshot(before=current) if current else None
+        if previous is None:
+            print("Need at least two snapshots to diff.")
+            return
+        report_changes(previous, current)
+        return
+
+    rank_keys = ["average_forever", "owners", "ccu"]
+
+    # One pass over the catalog builds a columnar table of every game
+    if len(sys.argv) > 1 and sys.argv[1] == "--pages":
+        checkpoint_dir = sys.argv[2] if len(sys.argv) > 2 else None
+        with SteamSpyFetcher(checkpoint_dir=checkpoint_dir) as fetcher:
+            table = GameTable.from_items(fetcher.iter_catalog())
+    elif len(sys.argv) > 1:
+        table = GameTable.from_items(iter_app_objects(chunks_from_file(sys.argv[1])))
+    else:
+        # the response is streamed into the on-disk cache, then parsed from there
+        cache = HTTPCache()
+        payload = cache.fetch(URL)
+        table = GameTable.from_items(iter_app_objects(chunks_from_file(payload)))
+        print(cache.summary())
+
+    # Rank by playtime, owners and CCU straight from the column arrays
+    rankings = {key: table.ranking(key, TOP_N) for key in rank_keys}
+    top_playtime = rankings["average_forever"]
+
+    # Save only the top 100 games to CSV (Rank, Name, Average_Playtime)
+    output_file = pathlib.Path.cwd() / "steam_top100_summary.csv"
+    write_ranking_csv(output_file, top_playtime, "Average_Playtime(min)")
+
+    # Save the top 100 games into a txt file
+    txt_output = pathlib.Path.cwd() / "steam_top100_summary.txt"
+    with txt_output.open("w", encoding="utf-8") as f:
+        f.write("Top 100 Steam Games by Average Playtime\n")
+        f.write("----------------------------------------\n")
+        for idx, (score, appid, name) in enumerate(top_playtime, start=1):
+            f.write(f"{idx}. {name}: {score} minutes\n")
+
+    # The other rankings from the same ingest
+    write_ranking_csv(pathlib.Path.cwd() / "steam_top100_by_owners.csv", rankings["owners"], "Owners(midpoint)")
+    write_ranking_csv(pathlib.Path.cwd() / "steam_top100_by_ccu.csv", rankings["ccu"], "CCU")
+
+    print("Top 100 games by average playtime written to steam_top100_summary.csv and steam_top100_summary.txt")
+    print("Top 100 games by owners and by CCU written to steam_top100_by_owners.csv and steam_top100_by_ccu.csv")
+
+    # Keep this run in the snapshot history and diff it against the previous one
+    previous = steam_snapshots.latest_snapshot()
+    current = steam_snapshots.save_snapshot(rankings)
+    print(f"Snapshot saved to {current}")
+    if previous is not None:
+        report_changes(previous, current)
+
+
+if __name__ == "__main__":
+    main()
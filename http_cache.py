@@ -0,0 +1,140 @@
+# On-disk HTTP response cache shared by the scripts that download remote data
+# (game_stats_tracker.py for SteamSpy, dataanalysis.py for the CSV datasets).
+#
+# Responses are stored one file per URL in CACHE_DIR with a small JSON index. A cached
+# response younger than `ttl` seconds is served straight from disk; an older one is
+# revalidated with If-None-Match / If-Modified-Since, so an unchanged resource costs
+# a 304 instead of a full download. The cache is kept under `max_bytes` by evicting
+# the least recently used entries, and every file is written atomically.
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+
+import requests
+
+
+CACHE_DIR = pathlib.Path.cwd() / ".http_cache"
+DEFAULT_TTL = 60 * 60
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+def _atomic_write_json(path, data):
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class HTTPCache:
+    """URL keyed response cache with TTL, conditional revalidation and LRU eviction."""
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, session=None):
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.session = session or requests.Session()
+        self._index_path = self.cache_dir / "index.json"
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.bytes_saved = 0
+
+    def _load_index(self):
+        try:
+            with self._index_path.open("r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        # forget entries whose body file has gone missing
+        return {url: e for url, e in index.items() if (self.cache_dir / e["file"]).exists()}
+
+    def _body_path(self, url):
+        return self.cache_dir / (hashlib.sha256(url.encode("utf-8")).hexdigest() + ".body")
+
+    def _hit(self, entry):
+        entry["last_used"] = time.time()
+        self.hits += 1
+        self.bytes_saved += entry["size"]
+        _atomic_write_json(self._index_path, self._index)
+        return self.cache_dir / entry["file"]
+
+    def fetch(self, url, ttl=None):
+        """Return the path of a local file holding the body of url.
+
+        The body is streamed to disk, so large responses are never held in
+        memory. The returned file stays valid until a later fetch evicts it.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._index.get(url)
+            if entry and time.time() - entry["fetched_at"] < ttl:
+                return self._hit(entry)
+
+            headers = {}
+            if entry and entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry and entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+            with self.session.get(url, headers=headers, stream=True) as response:
+                if entry and response.status_code == 304:
+                    self.revalidations += 1
+                    entry["fetched_at"] = time.time()
+                    return self._hit(entry)
+
+                response.raise_for_status()
+                path = self._body_path(url)
+                tmp = path.with_suffix(".tmp")
+                size = 0
+                with tmp.open("wb") as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        f.write(chunk)
+                        size += len(chunk)
+                os.replace(tmp, path)
+
+            now = time.time()
+            self._index[url] = {
+                "file": path.name,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": now,
+                "last_used": now,
+                "size": size,
+            }
+            self.misses += 1
+            self._evict(keep=url)
+            _atomic_write_json(self._index_path, self._index)
+            return path
+
+    def _evict(self, keep=None):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        total = sum(e["size"] for e in self._index.values())
+        for url, entry in sorted(self._index.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if url == keep:
+                continue
+            (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+            del self._index[url]
+            total -= entry["size"]
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "bytes_saved": self.bytes_saved,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"HTTP cache: {s['hits']} hits ({s['revalidations']} revalidated), "
+                f"{s['misses']} misses, {s['bytes_saved'] / (1024 * 1024):.1f} MB saved")
@@ -0,0 +1,226 @@
+import collections
+import json
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+
+class RollingWindow:
+    """Mean and sample standard deviation over the last `window` values, O(1) per update."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = collections.deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x: float):
+        # Welford's update, run backwards for the value that leaves the window
+        self.values.append(x)
+        n = len(self.values)
+        delta = x - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (x - self.mean)
+        if n > self.window:
+            old = self.values.popleft()
+            n -= 1
+            delta = old - self.mean
+            self.mean -= delta / n
+            self.m2 -= delta * (old - self.mean)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    def average(self) -> float:
+        return self.mean if self.full else math.nan
+
+    def std(self) -> float:
+        if not self.full or self.window < 2:
+            return math.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+    def state(self) -> dict:
+        return {"window": self.window, "values": list(self.values), "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_state(cls, state: dict):
+        rolling = cls(state["window"])
+        rolling.values.extend(state["values"])
+        rolling.mean, rolling.m2 = state["mean"], state["m2"]
+        return rolling
+
+
+class EMA:
+    """Exponential moving average, same as pandas ewm(alpha=alpha, adjust=False)."""
+
+    def __init__(self, alpha: float, min_periods: int = 1):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = math.nan
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        self.count += 1
+        if self.count == 1:
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value if self.count >= self.min_periods else math.nan
+
+    def state(self) -> dict:
+        return {"alpha": self.alpha, "min_periods": self.min_periods, "value": self.value, "count": self.count}
+
+    @classmethod
+    def from_state(cls, state: dict):
+        ema = cls(state["alpha"], state["min_periods"])
+        ema.value, ema.count = state["value"], state["count"]
+        return ema
+
+
+class IndicatorEngine:
+    """Streaming Return, SMA, EMA, RSI and rolling volatility of a close price series.
+
+    Each update() costs O(1) whatever the length of the history, and state()
+    / from_state() checkpoint the engine so it can resume after a restart.
+    The values match compute_batch() and the pandas formulas:
+      Return     close.pct_change()
+      SMA_n      close.rolling(n).mean()
+      EMA_n      close.ewm(span=n, adjust=False).mean()
+      RSI_n      Wilder RSI, gains/losses averaged with ewm(alpha=1/n, adjust=False, min_periods=n)
+      Volatility_n  Return.rolling(n).std()
+    """
+
+    def __init__(self, sma_windows=(10, 50), ema_span: int = 20, rsi_period: int = 14, vol_window: int = 20):
+        self.prev_close = math.nan
+        self.smas = {n: RollingWindow(n) for n in sma_windows}
+        self.ema_span = ema_span
+        self.ema = EMA(2 / (ema_span + 1))
+        self.rsi_period = rsi_period
+        self.avg_gain = EMA(1 / rsi_period, rsi_period)
+        self.avg_loss = EMA(1 / rsi_period, rsi_period)
+        self.vol = RollingWindow(vol_window)
+
+    def update(self, close: float) -> dict:
+        """Feed one new bar's close and return the indicator values for it."""
+        ret = close / self.prev_close - 1 if not math.isnan(self.prev_close) else math.nan
+        features = {"Return": ret}
+
+        for n, sma in self.smas.items():
+            sma.update(close)
+            features[f"SMA_{n}"] = sma.average()
+
+        features[f"EMA_{self.ema_span}"] = self.ema.update(close)
+
+        rsi = math.nan
+        if not math.isnan(self.prev_close):
+            delta = close - self.prev_close
+            gain = self.avg_gain.update(max(delta, 0.0))
+            loss = self.avg_loss.update(max(-delta, 0.0))
+            if not math.isnan(gain):
+                rsi = 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)
+            self.vol.update(ret)
+        features[f"RSI_{self.rsi_period}"] = rsi
+        features[f"Volatility_{self.vol.window}"] = self.vol.std()
+
+        self.prev_close = close
+        return features
+
+    def update_many(self, closes) -> list:
+        """Feed several new bars in order, returning one features dict per bar."""
+        return [self.update(float(close)) for close in closes]
+
+    def state(self) -> dict:
+        return {
+            "prev_close": self.prev_close,
+            "smas": [sma.state() for sma in self.smas.values()],
+            "ema_span": self.ema_span,
+            "ema": self.ema.state(),
+            "rsi_period": self.rsi_period,
+            "avg_gain": self.avg_gain.state(),
+            "avg_loss": self.avg_loss.state(),
+            "vol": self.vol.state(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict):
+        engine = cls(sma_windows=(), ema_span=state["ema_span"], rsi_period=state["rsi_period"])
+        engine.prev_close = state["prev_close"]
+        engine.smas = {s["window"]: RollingWindow.from_state(s) for s in state["smas"]}
+        engine.ema = EMA.from_state(state["ema"])
+        engine.avg_gain = EMA.from_state(state["avg_gain"])
+        engine.avg_loss = EMA.from_state(state["avg_loss"])
+        engine.vol = RollingWindow.from_state(state["vol"])
+        return engine
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.state(), f)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path) as f:
+            return cls.from_state(json.load(f))
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    # along axis 0, so a (bars, tickers) array gets one rolling mean per column
+    out = np.full(x.shape, np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window, axis=0).mean(axis=-1)
+    return out
+
+
+def _rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).std(axis=1, ddof=1)
+    return out
+
+
+def _ema(x: np.ndarray, alpha: float) -> np.ndarray:
+    # y[t] = alpha * x[t] + (1 - alpha) * y[t-1], seeded with y[0] = x[0]
+    if len(x) == 0:
+        return np.zeros(0)
+    return lfilter([alpha], [1, alpha - 1], x, zi=[(1 - alpha) * x[0]])[0]
+
+
+def price_features(close: np.ndarray, sma_windows=(10, 50)) -> dict:
+    """Return and SMA_n of a close array, or of every column of a (bars, tickers) array.
+
+    NaN prices propagate like pct_change(fill_method=None) and rolling(n).mean().
+    """
+    close = np.asarray(close, dtype=float)
+    ret = np.full(close.shape, np.nan)
+    ret[1:] = close[1:] / close[:-1] - 1
+    features = {"Return": ret}
+    for n in sma_windows:
+        features[f"SMA_{n}"] = _rolling_mean(close, n)
+    return features
+
+
+def compute_batch(close: np.ndarray, sma_windows=(10, 50), ema_span: int = 20,
+                  rsi_period: int = 14, vol_window: int = 20) -> dict:
+    """Vectorized version of IndicatorEngine over a whole close price array."""
+    close = np.asarray(close, dtype=float)
+    features = price_features(close, sma_windows)
+    ret = features["Return"]
+
+    features[f"EMA_{ema_span}"] = _ema(close, 2 / (ema_span + 1))
+
+    rsi = np.full(len(close), np.nan)
+    if len(close) > rsi_period:
+        delta = np.diff(close)
+        gain = _ema(np.maximum(delta, 0), 1 / rsi_period)
+        loss = _ema(np.maximum(-delta, 0), 1 / rsi_period)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(loss == 0, 100.0, 100 - 100 / (1 + gain / loss))
+        rsi[rsi_period:] = values[rsi_period - 1:]
+    features[f"RSI_{rsi_period}"] = rsi
+
+    vol = np.full(len(close), np.nan)
+    vol[1:] = _rolling_std(ret[1:], vol_window)
+    features[f"Volatility_{vol_window}"] = vol
+    return features
@@ -0,0 +1,158 @@
+import collections
+import datetime
+import os
+import sqlite3
+
+import pandas as pd
+import yfinance as yf
+
+
+STORE_PATH = "market_data.db"
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class YahooProvider:
+    """Fetch daily OHLCV bars from Yahoo Finance."""
+
+    def fetch(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        return self.fetch_many([ticker], start, end)[ticker]
+
+    def fetch_many(self, tickers, start: str, end: str) -> dict:
+        """Download several tickers in one batched request, returning {ticker: bars}."""
+        data = yf.download(list(tickers), start=start, end=end, progress=False, group_by="ticker")
+        result = {}
+        for ticker in tickers:
+            if data.empty or ticker not in data.columns.get_level_values(0):
+                result[ticker] = pd.DataFrame(columns=PRICE_COLUMNS)
+            else:
+                result[ticker] = data[ticker][PRICE_COLUMNS].dropna(how="all")
+        return result
+
+
+class CSVProvider:
+    """Serve bars from local <directory>/<TICKER>.csv fixture files (Date,Open,High,Low,Close,Volume)."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        path = os.path.join(self.directory, f"{ticker}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=PRICE_COLUMNS)
+        data = pd.read_csv(path, index_col="Date", parse_dates=True)
+        return data.loc[(data.index >= start) & (data.index < end), PRICE_COLUMNS]
+
+    def fetch_many(self, tickers, start: str, end: str) -> dict:
+        return {ticker: self.fetch(ticker, start, end) for ticker in tickers}
+
+
+class OHLCVStore:
+    """Local SQLite store of daily bars keyed by (ticker, date).
+
+    The date span already fetched for each ticker is recorded, so get() only
+    asks the provider for the part of the requested window that is missing
+    and upserts just those rows.
+    """
+
+    def __init__(self, path: str = STORE_PATH, provider=None):
+        self.provider = provider or YahooProvider()
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS ohlcv (
+                ticker TEXT NOT NULL,
+                date TEXT NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume INTEGER,
+                PRIMARY KEY (ticker, date)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS coverage (
+                ticker TEXT PRIMARY KEY,
+                start TEXT NOT NULL,
+                end TEXT NOT NULL
+            );
+            """
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def missing_ranges(self, ticker: str, start: str, end: str):
+        """Return the [start, end) windows not fetched yet for ticker."""
+        row = self.conn.execute("SELECT start, end FROM coverage WHERE ticker=?", (ticker,)).fetchone()
+        if row is None:
+            return [(start, end)]
+        have_start, have_end = row
+        ranges = []
+        if start < have_start:
+            ranges.append((start, have_start))
+        if end > have_end:
+            # fetch from the end of coverage so the covered span stays contiguous
+            ranges.append((have_end, end))
+        return ranges
+
+    def upsert(self, ticker: str, data: pd.DataFrame):
+        rows = [
+            (ticker, date.strftime("%Y-%m-%d"), float(r.Open), float(r.High), float(r.Low),
+             float(r.Close), int(r.Volume))
+            for date, r in zip(data.index, data.itertuples(index=False))
+        ]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO ohlcv VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def _extend_coverage(self, ticker: str, start: str, end: str):
+        # today's bar is still moving, so it is never marked as covered
+        end = min(end, datetime.date.today().isoformat())
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO coverage (ticker, start, end) VALUES (?, ?, ?)
+                ON CONFLICT(ticker) DO UPDATE SET start=min(start, excluded.start), end=max(end, excluded.end)
+                """,
+                (ticker, start, end),
+            )
+
+    def get(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        """Return bars for ticker in [start, end), fetching only what is missing."""
+        data = self.get_many([ticker], start, end)
+        if ticker not in data.index.get_level_values("Ticker"):
+            return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+        return data.xs(ticker, level="Ticker")
+
+    def get_many(self, tickers, start: str, end: str) -> pd.DataFrame:
+        """Return bars for several tickers on a (Date, Ticker) MultiIndex.
+
+        Tickers missing the same window are downloaded together in one
+        provider call.
+        """
+        to_fetch = collections.defaultdict(list)
+        for ticker in tickers:
+            for window in self.missing_ranges(ticker, start, end):
+                to_fetch[window].append(ticker)
+
+        for (missing_start, missing_end), group in to_fetch.items():
+            fetched = self.provider.fetch_many(group, missing_start, missing_end)
+            added = 0
+            for ticker in group:
+                added += self.upsert(ticker, fetched[ticker])
+                self._extend_coverage(ticker, missing_start, missing_end)
+            print(f"Fetched {added} new bars for {len(group)} ticker(s) for {missing_start} to {missing_end}")
+
+        # stay well under SQLite's limit on bound parameters
+        frames = []
+        tickers = list(tickers)
+        for i in range(0, len(tickers), 500):
+            chunk = tickers[i:i + 500]
+            frames.append(pd.read_sql_query(
+                f"""
+                SELECT date, ticker, open, high, low, close, volume FROM ohlcv
+                WHERE ticker IN ({",".join("?" * len(chunk))}) AND date>=? AND date<?
+                """,
+                self.conn,
+                params=(*chunk, start, end),
+                parse_dates=["date"],
+            ))
+        data = pd.concat(frames).set_index(["date", "ticker"]).sort_index()
+        data.columns = PRICE_COLUMNS
+        data.index.names = ["Date", "Ticker"]
+        return data
@@ -0,0 +1,95 @@
+# Snapshot history for game_stats_tracker.py
+#
+# Every ingest is saved as one compressed .npz file in SNAPSHOT_DIR. For each ranking
+# (average_forever, owners, ccu, ...) it holds three columns in rank order: appid,
+# score and name. Only the most recent snapshot is ever loaded to compute the diff
+# for a new run, so the cost of a daily report does not grow with the history.
+
+import datetime
+import pathlib
+
+import numpy as np
+
+
+SNAPSHOT_DIR = pathlib.Path.cwd() / "steam_snapshots"
+
+
+def save_snapshot(rankings, snapshot_dir=SNAPSHOT_DIR, taken_at=None):
+    """Save {ranking: [(score, appid, name), ...]} as a columnar snapshot."""
+    snapshot_dir = pathlib.Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    taken_at = taken_at or datetime.datetime.now()
+
+    columns = {}
+    for name, ranked in rankings.items():
+        columns[f"{name}__appid"] = np.array([appid for _, appid, _ in ranked], dtype=np.int64)
+        columns[f"{name}__score"] = np.array([score for score, _, _ in ranked], dtype=np.int64)
+        columns[f"{name}__name"] = np.array([game for _, _, game in ranked], dtype=str)
+
+    path = snapshot_dir / f"steam_{taken_at:%Y%m%d-%H%M%S}.npz"
+    np.savez_compressed(path, **columns)
+    return path
+
+
+def latest_snapshot(snapshot_dir=SNAPSHOT_DIR, before=None):
+    """Return the path of the newest snapshot (optionally older than `before`), or None."""
+    paths = sorted(pathlib.Path(snapshot_dir).glob("steam_*.npz"))
+    if before is not None:
+        paths = [p for p in paths if p.name < pathlib.Path(before).name]
+    return paths[-1] if paths else None
+
+
+def load_snapshot(path):
+    """Load a snapshot back into {ranking: {"appid": ..., "score": ..., "name": ...}}."""
+    snapshot = {}
+    with np.load(path) as data:
+        for key in data.files:
+            name, column = key.split("__")
+            snapshot.setdefault(name, {})[column] = data[key]
+    return snapshot
+
+
+def diff_ranking(previous, current):
+    """Compare two snapshot columns of the same ranking.
+
+    Returns a dict with:
+      moved   - [(appid, name, old_rank, new_rank)] for games whose rank changed
+      new     - [(appid, name, new_rank)] for games that entered the ranking
+      dropped - [(appid, name, old_rank)] for games that left it
+    """
+    prev_ids, cur_ids = previous["appid"], current["appid"]
+    _, prev_idx, cur_idx = np.intersect1d(prev_ids, cur_ids, assume_unique=True, return_indices=True)
+    changed = prev_idx != cur_idx
+    order = np.argsort(cur_idx[changed])
+    moved_prev, moved_cur = prev_idx[changed][order], cur_idx[changed][order]
+
+    new_idx = np.flatnonzero(~np.isin(cur_ids, prev_ids))
+    dropped_idx = np.flatnonzero(~np.isin(prev_ids, cur_ids))
+
+    return {
+        "moved": [(int(cur_ids[c]), str(current["name"][c]), int(p) + 1, int(c) + 1)
+                  for p, c in zip(moved_prev, moved_cur)],
+        "new": [(int(cur_ids[c]), str(current["name"][c]), int(c) + 1) for c in new_idx],
+        "dropped": [(int(prev_ids[p]), str(previous["name"][p]), int(p) + 1) for p in dropped_idx],
+    }
+
+
+def diff_snapshots(previous, current):
+    """Diff every ranking present in both snapshots."""
+    return {name: diff_ranking(previous[name], current[name]) for name in current if name in previous}
+
+
+def write_diff_report(path, diffs, previous_path):
+    path = pathlib.Path(path)
+    with path.open("w", encoding="utf-8") as f:
+        f.write(f"Ranking changes since {pathlib.Path(previous_path).stem}\n")
+        f.write("----------------------------------------\n")
+        for name, diff in diffs.items():
+            f.write(f"\n[{name}]\n")
+            for appid, game, rank in diff["new"]:
+                f.write(f"  NEW     #{rank} {game} ({appid})\n")
+            for appid, game, old_rank, new_rank in diff["moved"]:
+                arrow = "up" if new_rank < old_rank else "down"
+                f.write(f"  {arrow:<7} #{old_rank} -> #{new_rank} {game} ({appid})\n")
+            for appid, game, rank in diff["dropped"]:
+                f.write(f"  DROPPED was #{rank} {game} ({appid})\n")
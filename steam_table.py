@@ -0,0 +1,145 @@
+# Columnar in-memory table of SteamSpy games used by game_stats_tracker.py
+#
+# Instead of one Python tuple (or dict) per game, every numeric field lives in its own
+# numpy array and names are stored once in a string pool (one UTF-8 blob plus an
+# offsets array), referenced by index. The
+# catalog can then be filtered, ranked and aggregated with vectorized numpy operations.
+
+import array
+
+import numpy as np
+
+
+# column name -> numpy dtype of the finished column
+COLUMNS = {
+    "appid": np.int32,
+    "average_forever": np.int32,
+    "median_forever": np.int32,
+    "owners_low": np.uint32,
+    "owners_high": np.uint32,
+    "ccu": np.int32,
+    "name_id": np.int32,
+}
+
+
+def parse_owners(owners):
+    """Split an owners range like "1,000,000 .. 2,000,000" into (low, high)."""
+    try:
+        low, high = owners.split("..")
+        return int(low.replace(",", "")), int(high.replace(",", ""))
+    except (AttributeError, ValueError):
+        return 0, 0
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class NamePool:
+    """Interned strings packed into one UTF-8 buffer, looked up by id."""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, name_id):
+        start, end = self.offsets[name_id], self.offsets[name_id + 1]
+        return self.blob[start:end].decode("utf-8")
+
+    @property
+    def nbytes(self):
+        return len(self.blob) + self.offsets.nbytes
+
+
+class GameTable:
+    """Column arrays for a SteamSpy catalog plus an interned name pool."""
+
+    def __init__(self, columns, names):
+        self.columns = columns
+        self.names = names
+
+    def __len__(self):
+        return len(self.columns["appid"])
+
+    def __getitem__(self, column):
+        if column == "owners":
+            # rank / aggregate on the midpoint of the owners range
+            low = self.columns["owners_low"].astype(np.int64)
+            return (low + self.columns["owners_high"]) // 2
+        return self.columns[column]
+
+    @classmethod
+    def from_items(cls, items):
+        """Build the table from (appid, game) pairs in one pass.
+
+        Values are appended to compact array.array buffers while parsing. The
+        one per-game Python object held during the build is the str of each
+        distinct name, kept in name_ids for interning. It is dropped once the
+        table is built, so the peak during ingest grows with the number of
+        distinct names, while the finished table keeps no per-game objects.
+        """
+        buffers = {name: array.array("q") for name in COLUMNS}
+        blob = bytearray()
+        offsets = array.array("q", [0])
+        name_ids = {}
+
+        for appid, game in items:
+            name = str(game.get("name", "Unknown"))
+            name_id = name_ids.get(name)
+            if name_id is None:
+                name_id = name_ids[name] = len(offsets) - 1
+                blob += name.encode("utf-8")
+                offsets.append(len(blob))
+            low, high = parse_owners(game.get("owners"))
+
+            buffers["appid"].append(_to_int(appid))
+            buffers["average_forever"].append(_to_int(game.get("average_forever", 0)))
+            buffers["median_forever"].append(_to_int(game.get("median_forever", 0)))
+            buffers["owners_low"].append(low)
+            buffers["owners_high"].append(high)
+            buffers["ccu"].append(_to_int(game.get("ccu", 0)))
+            buffers["name_id"].append(name_id)
+
+        columns = {
+            name: np.frombuffer(buffers[name], dtype=np.int64).astype(dtype)
+            for name, dtype in COLUMNS.items()
+        }
+        return cls(columns, NamePool(bytes(blob), np.frombuffer(offsets, dtype=np.int64)))
+
+    def name(self, row):
+        return self.names[self.columns["name_id"][row]]
+
+    def nbytes(self):
+        """Approximate memory used by the columns and the name pool."""
+        return sum(c.nbytes for c in self.columns.values()) + self.names.nbytes
+
+    def filter(self, mask):
+        """Return a new table with only the rows where mask is True."""
+        return GameTable({name: col[mask] for name, col in self.columns.items()}, self.names)
+
+    def top_k(self, column, k):
+        """Return the rows with the k highest positive values of column, best first.
+
+        Uses a partial partition instead of a full sort. Ties keep catalog
+        order, same as a stable sort over the ingest would.
+        """
+        scores = self[column]
+        rows = np.flatnonzero(scores > 0)
+        if len(rows) > k:
+            kth = np.partition(scores[rows], len(rows) - k)[len(rows) - k]
+            above = rows[scores[rows] > kth]
+            ties = rows[scores[rows] == kth][:k - len(above)]
+            rows = np.concatenate([above, ties])
+        return rows[np.lexsort((rows, -scores[rows]))]
+
+    def ranking(self, column, k):
+        """Return [(score, appid, name), ...] for the top k rows of column."""
+        scores = self[column]
+        appids = self.columns["appid"]
+        return [(int(scores[r]), int(appids[r]), self.name(r)) for r in self.top_k(column, k)]
@@ -0,0 +1,170 @@
+# Paginated SteamSpy fetcher used by game_stats_tracker.py
+# API used: https://steamspy.com/api.php
+#
+# SteamSpy allows 1 request per second for most requests and 1 request per 60 seconds
+# for request=all pages, so every request goes through a client-side rate limiter.
+# Pages are fetched by a small thread pool over one pooled requests.Session, which lets
+# the download of one page overlap the wait for the next instead of blocking on a single
+# giant request=all response.
+
+import collections
+import json
+import os
+import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+BASE_URL = "https://steamspy.com/api.php"
+ALL_INTERVAL = 60.0
+DETAILS_INTERVAL = 1.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RateLimiter:
+    """Let at most one request start every `interval` seconds, across threads."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self, stop=None):
+        """Block until this caller may start; returns False if `stop` was set meanwhile."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if stop is None:
+            if start > now:
+                time.sleep(start - now)
+            return True
+        return not stop.wait(max(start - now, 0))
+
+
+class SteamSpyFetcher:
+    """Fetch request=all pages and request=appdetails entries from SteamSpy.
+
+    base_url can point at a local stand-in server for testing, and the rate
+    limits can be lowered to match. If checkpoint_dir is given every page is
+    saved there as page_<N>.json once fetched, and pages already on disk are
+    reused, so an interrupted refresh picks up where it stopped.
+    """
+
+    def __init__(self, base_url=BASE_URL, max_workers=4, all_interval=ALL_INTERVAL,
+                 details_interval=DETAILS_INTERVAL, retries=5, backoff=1.0, timeout=60,
+                 checkpoint_dir=None):
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.all_limiter = RateLimiter(all_interval)
+        self.details_limiter = RateLimiter(details_interval)
+        self.checkpoint_dir = pathlib.Path(checkpoint_dir) if checkpoint_dir else None
+        if self.checkpoint_dir:
+            self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+        # one connection pool shared by all worker threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _get(self, params, limiter, stop=None):
+        """GET one API call, retrying with exponential backoff on transient errors.
+
+        Returns None without sending anything if `stop` is set while waiting
+        for the rate limiter.
+        """
+        for attempt in range(self.retries + 1):
+            if not limiter.wait(stop):
+                return None
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                response.raise_for_status()
+                return response.json()
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                status = e.response.status_code if e.response is not None else None
+                if status is not None and status not in RETRY_STATUSES:
+                    raise
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def _checkpoint_path(self, page):
+        return self.checkpoint_dir / f"page_{page}.json"
+
+    def fetch_page(self, page, stop=None):
+        """Return the {appid: game} dict for one request=all page ({} if `stop` was set first)."""
+        if self.checkpoint_dir:
+            path = self._checkpoint_path(page)
+            if path.exists():
+                with path.open("r", encoding="utf-8") as f:
+                    return json.load(f)
+
+        data = self._get({"request": "all", "page": page}, self.all_limiter, stop) or {}
+
+        if self.checkpoint_dir and data:
+            # write to a temp file first so a crash never leaves a half written page
+            tmp = path.with_suffix(".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        return data
+
+    def iter_pages(self, start_page=0):
+        """Yield request=all pages in order until SteamSpy returns an empty page.
+
+        Up to max_workers pages are in flight at once. Once the end is reached
+        (or the caller stops iterating) the pages still queued or waiting on
+        the rate limiter are dropped without being requested.
+        """
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = collections.deque()
+            next_page = start_page
+            for _ in range(self.max_workers):
+                pending.append(pool.submit(self.fetch_page, next_page, stop))
+                next_page += 1
+
+            try:
+                while pending:
+                    data = pending.popleft().result()
+                    if not data:
+                        break
+                    yield data
+                    pending.append(pool.submit(self.fetch_page, next_page, stop))
+                    next_page += 1
+            finally:
+                stop.set()
+                for future in pending:
+                    future.cancel()
+
+    def iter_catalog(self, start_page=0):
+        """Yield (appid, game) pairs for the whole catalog, page by page."""
+        for page in self.iter_pages(start_page):
+            yield from page.items()
+
+    def fetch_appdetails(self, appids):
+        """Fetch request=appdetails for each appid, returning {appid: details}."""
+        appids = list(appids)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = pool.map(
+                lambda appid: self._get({"request": "appdetails", "appid": appid}, self.details_limiter),
+                appids,
+            )
+            return dict(zip(appids, results))
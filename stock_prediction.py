@@ -1,29 +1,78 @@
-import yfinance as yf
+import functools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+
+from backtest import walk_forward
+from indicators import IndicatorEngine, price_features
+from market_data import OHLCVStore
 
 
-def fetch_data(ticker: str, start: str, end: str) -> pd.DataFrame:
-    """Fetch stock data from Yahoo Finance."""
-    data = yf.download(ticker, start=start, end=end)
+def fetch_data(ticker: str, start: str, end: str, store: OHLCVStore = None) -> pd.DataFrame:
+    """Fetch stock data, downloading from Yahoo Finance only what the local store is missing."""
+    store = store or OHLCVStore()
+    data = store.get(ticker, start, end)
     return data
 
 
 def preprocess_data(data: pd.DataFrame) -> pd.DataFrame:
     """Feature engineering and target creation."""
-    data["Return"] = data["Close"].pct_change()
-    data["SMA_10"] = data["Close"].rolling(window=10).mean()
-    data["SMA_50"] = data["Close"].rolling(window=50).mean()
+    for name, values in price_features(data["Close"].to_numpy()).items():
+        data[name] = values
     data["Target"] = (data["Return"].shift(-1) > 0).astype(int)
     data = data.dropna()
     return data
 
 
-def train_model(data: pd.DataFrame):
+def preprocess_many(data: pd.DataFrame) -> pd.DataFrame:
+    """Same features as preprocess_data, for all tickers of a (Date, Ticker) frame at once.
+
+    Close is pivoted to one column per ticker so every indicator is a single
+    vectorized operation over the whole universe. Each column is first
+    packed so the ticker's own bars come first and the dates it has no bar
+    for go to the end. A gap in one ticker's history therefore does not put
+    NaN into its windows, and every ticker's features match preprocess_data
+    on its own bars.
+    """
+    close = data["Close"].unstack("Ticker")
+    values = close.to_numpy()
+    order = np.argsort(np.isnan(values), axis=0, kind="stable")
+    packed = price_features(np.take_along_axis(values, order, axis=0))
+    next_return = np.vstack([packed["Return"][1:], np.full((1, values.shape[1]), np.nan)])
+    packed["Target"] = (next_return > 0).astype(int)
+
+    wide = {}
+    for name, column in packed.items():
+        unpacked = np.empty_like(column)
+        np.put_along_axis(unpacked, order, column, axis=0)
+        wide[name] = pd.DataFrame(unpacked, index=close.index, columns=close.columns)
+    features = pd.concat({name: frame.stack() for name, frame in wide.items()}, axis=1)
+    data = data.join(features, how="inner")
+    data = data.dropna()
+    return data
+
+
+def update_features(bars: pd.DataFrame, checkpoint: str) -> pd.DataFrame:
+    """Indicators for newly arrived bars, resuming the IndicatorEngine saved at checkpoint.
+
+    Only the new bars are processed, so each one costs O(1) however long the
+    history is. The engine is created on first use and saved back afterwards.
+    """
+    engine = IndicatorEngine.load(checkpoint) if os.path.exists(checkpoint) else IndicatorEngine()
+    features = pd.DataFrame(engine.update_many(bars["Close"]), index=bars.index)
+    engine.save(checkpoint)
+    return bars.join(features)
+
+
+def train_model(data: pd.DataFrame, verbose: bool = True):
     """Train logistic regression model on stock data."""
     X = data[["SMA_10", "SMA_50", "Return"]]
     y = data["Target"]
@@ -37,32 +86,199 @@ def train_model(data: pd.DataFrame):
     y_pred = model.predict(X_test)
 
     acc = accuracy_score(y_test, y_pred)
-    print(f"Prediction Accuracy: {acc:.2f}")
+    if verbose:
+        print(f"Prediction Accuracy: {acc:.2f}")
 
     return model, X_test, y_test, y_pred
 
 
-def save_to_db(data: pd.DataFrame, table_name: str = "stock_data"):
-    """Save processed data to SQLite database (can adapt for Databricks)."""
-    engine = create_engine("sqlite:///stocks.db")
-    data.to_sql(table_name, engine, if_exists="replace", index=True)
+DB_URL = "sqlite:///stocks.db"
+INSERT_CHUNK_SIZE = 50_000
+
+
+@functools.lru_cache(maxsize=None)
+def get_engine(url: str = DB_URL):
+    """Return one pooled engine per database URL, created on first use."""
+    engine = create_engine(url)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, _):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    return engine
+
+
+def _sql_type(dtype) -> str:
+    # dates are stored as 'YYYY-MM-DD' text, which sorts correctly and is half the default size
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def save_to_db(data: pd.DataFrame, table_name: str = "stock_data", url: str = DB_URL):
+    """Save processed data to SQLite database (can adapt for Databricks).
+
+    The table is replaced like before, but rows go in with chunked
+    executemany calls inside a single transaction, using explicit column
+    types and an index on Date (plus Ticker for multi-ticker frames).
+    """
+    data = data.reset_index()
+    for col in data.columns:
+        if pd.api.types.is_datetime64_any_dtype(data[col]):
+            data[col] = data[col].dt.strftime("%Y-%m-%d")
+    columns = [str(col) for col in data.columns]
+
+    quoted = ", ".join(f'"{col}" {_sql_type(dtype)}' for col, dtype in zip(columns, data.dtypes))
+    index_cols = ", ".join(f'"{col}"' for col in ("Ticker", "Date") if col in columns)
+    insert = f'INSERT INTO "{table_name}" VALUES ({", ".join("?" * len(columns))})'
+
+    with get_engine(url).begin() as conn:
+        conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{table_name}"')
+        conn.exec_driver_sql(f'CREATE TABLE "{table_name}" ({quoted})')
+        for start in range(0, len(data), INSERT_CHUNK_SIZE):
+            chunk = data.iloc[start:start + INSERT_CHUNK_SIZE]
+            # tolist() turns numpy scalars into plain Python values sqlite3 can bind
+            rows = list(zip(*(chunk[col].tolist() for col in chunk.columns)))
+            conn.exec_driver_sql(insert, rows)
+        if index_cols:
+            conn.exec_driver_sql(f'CREATE INDEX "idx_{table_name}_date" ON "{table_name}" ({index_cols})')
+
     print(f"Data saved to database table '{table_name}'")
 
 
-def plot_data(data: pd.DataFrame, ticker: str):
-    """Visualize stock closing price and moving averages."""
-    plt.figure(figsize=(12, 6))
-    plt.plot(data.index, data["Close"], label="Close Price")
-    plt.plot(data.index, data["SMA_10"], label="10-day SMA")
-    plt.plot(data.index, data["SMA_50"], label="50-day SMA")
-    plt.legend()
-    plt.title(f"{ticker} Stock Price & Moving Averages")
-    plt.xlabel("Date")
-    plt.ylabel("Price (USD)")
-    plt.show()
+CHART_DPI = 100
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int):
+    """Largest-Triangle-Three-Buckets downsampling of (x, y) to n_out points.
+
+    Keeps the first and last point and, from each bucket in between, the
+    point that spans the largest triangle with its neighbours, so peaks and
+    troughs survive while flat stretches are thinned out.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    keep = np.zeros(n_out, dtype=np.int64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the next bucket is the third corner of the triangle
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    keep[-1] = n - 1
+    return x[keep], y[keep]
+
+
+def plot_data(data: pd.DataFrame, ticker: str, path: str = None, width_px: int = 1200):
+    """Render closing price and moving averages to a PNG/SVG file.
+
+    Drawn with matplotlib's Agg backend, so no GUI window blocks the run.
+    Each line is downsampled to about one point per horizontal pixel.
+    """
+    path = path or f"{ticker}_chart.png"
+    x = data.index.to_numpy().astype("datetime64[ns]").astype(np.int64)
+
+    fig = Figure(figsize=(width_px / CHART_DPI, width_px / CHART_DPI / 2), dpi=CHART_DPI)
+    ax = fig.add_subplot()
+    for column, label in (("Close", "Close Price"), ("SMA_10", "10-day SMA"), ("SMA_50", "50-day SMA")):
+        px, py = lttb(x, data[column].to_numpy(dtype=float), width_px)
+        ax.plot(px.astype("datetime64[ns]"), py, label=label)
+    ax.legend()
+    ax.set_title(f"{ticker} Stock Price & Moving Averages")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Price (USD)")
+    fig.savefig(path)
+    return path
+
+
+def _render_chart(item):
+    ticker, data, path = item
+    return plot_data(data, ticker, path)
+
+
+def render_charts(groups, out_dir: str = "charts", fmt: str = "png", workers: int = None):
+    """Render one chart per (ticker, data) pair across worker processes."""
+    os.makedirs(out_dir, exist_ok=True)
+    items = [(ticker, data, os.path.join(out_dir, f"{ticker}.{fmt}")) for ticker, data in groups]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_chart, items))
+
+
+def _train_ticker(item):
+    # runs in a worker process; only the small result is sent back
+    ticker, data = item
+    try:
+        _, X_test, y_test, y_pred = train_model(data, verbose=False)
+    except ValueError as e:
+        return ticker, len(data), None, str(e)
+    return ticker, len(data), accuracy_score(y_test, y_pred), ""
+
+
+def run_batch(tickers, start_date: str, end_date: str, workers: int = None, store: OHLCVStore = None) -> pd.DataFrame:
+    """Fetch, preprocess and train every ticker, returning a per-ticker accuracy table."""
+    store = store or OHLCVStore()
+    workers = workers or os.cpu_count()
+
+    print(f"Fetching {len(tickers)} tickers...")
+    raw_data = store.get_many(tickers, start_date, end_date)
+
+    print("Preprocessing data...")
+    processed = preprocess_many(raw_data)
+    groups = [(ticker, frame.droplevel("Ticker")) for ticker, frame in processed.groupby(level="Ticker")]
+
+    print(f"Training {len(groups)} models on {workers} processes...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_train_ticker, groups, chunksize=max(1, len(groups) // (4 * workers))))
+
+    print("Saving data to database...")
+    save_to_db(processed, "batch_stock")
+
+    print("Rendering charts...")
+    render_charts(groups, workers=workers)
+
+    summary = pd.DataFrame(results, columns=["Ticker", "Rows", "Accuracy", "Error"]).set_index("Ticker")
+    missing = sorted(set(tickers) - set(summary.index))
+    for ticker in missing:
+        summary.loc[ticker] = [0, None, "no data"]
+    return summary.sort_values("Accuracy", ascending=False)
+
+
+def run_walk_forward(ticker: str, start_date: str, end_date: str):
+    """Walk-forward backtest of one ticker, printing per-window accuracy and the equity curve."""
+    processed_data = preprocess_data(fetch_data(ticker, start_date, end_date))
+    windows, equity, timings = walk_forward(processed_data)
+
+    print(windows.to_string(index=False, float_format="{:.2f}".format))
+    print(f"Mean window accuracy: {windows['accuracy'].mean():.2f}")
+    print(f"Final equity: {equity.iloc[-1]:.2f}x (buy and hold: "
+          f"{processed_data['Close'].iloc[-1] / processed_data['Close'].loc[equity.index[0]]:.2f}x)")
+    print(f"{timings['windows']} windows in {timings['total_seconds']:.2f}s "
+          f"({timings['ms_per_window']:.1f} ms/window, {timings['fit_seconds']:.2f}s fitting)")
 
 
 def main():
+    # python stock_prediction.py --walk-forward [TICKER]  runs a walk-forward backtest
+    if len(sys.argv) > 1 and sys.argv[1] == "--walk-forward":
+        run_walk_forward(sys.argv[2] if len(sys.argv) > 2 else "AAPL", "2020-01-01", "2025-01-01")
+        return
+
+    # python stock_prediction.py AAPL MSFT ...  runs the batch pipeline over those tickers
+    if len(sys.argv) > 1:
+        summary = run_batch(sys.argv[1:], "2020-01-01", "2025-01-01")
+        print(summary.to_string(float_format="{:.2f}".format))
+        return
+
     ticker = "AAPL" 
     start_date = "2020-01-01"
     end_date = "2025-01-01"
@@ -80,7 +296,8 @@ def main():
     save_to_db(processed_data, f"{ticker}_stock")
 
     print("Plotting results...")
-    plot_data(processed_data, ticker)
+    chart = plot_data(processed_data, ticker)
+    print(f"Chart saved to {chart}")
 
     print("Done!")
 
@@ -1,14 +1,140 @@
+import atexit
+import collections
+import contextlib
+import functools
+import pathlib
+import queue
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import date, datetime, timedelta
 
 DB_NAME = "tasks.db"
+STATEMENT_CACHE_SIZE = 256
+CACHE_SIZE_KB = 16_384
+PAGE_SIZE = 50
+WRITE_BATCH_SIZE = 1000
+SEARCH_LIMIT = 20
+# bm25 column weights: a match in the title counts more than one in the description
+TITLE_WEIGHT, DESCRIPTION_WEIGHT = 10.0, 1.0
+DATE_FORMATS = ["%Y-%m-%d", "%Y/%m/%d"]
+# day-first and month-first readings of the same text; a date is only taken from these
+# if the readings agree or just one is valid, so 25/04/2025 parses but 03/04/2025 does not
+DAY_MONTH_FORMATS = [("%d/%m/%Y", "%m/%d/%Y"), ("%d-%m-%Y", "%m-%d-%Y"), ("%d.%m.%Y", "%m.%d.%Y")]
 
+Task = collections.namedtuple("Task", ["id", "title", "description", "due_date", "status"])
+SearchResult = collections.namedtuple("SearchResult", ["task", "rank", "snippet"])
 
-def init_db():
-    """Initialize database and create tasks table if not exists."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute(
+
+class Database:
+    """Long-lived SQLite connections, one per thread, shared by all task functions.
+
+    Each connection is opened once in WAL mode with synchronous=NORMAL and a
+    larger page cache, and keeps a cache of prepared statements. Connections
+    run in autocommit mode; transaction() groups several statements into one
+    transaction (and one fsync), and nested transaction() blocks join the
+    outermost one.
+
+    With readonly=True the connections are opened read-only; the database
+    must already exist and be in WAL mode, so readers never block the writer.
+    """
+
+    def __init__(self, path=DB_NAME, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self._local = threading.local()
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.readonly:
+                uri = pathlib.Path(self.path).resolve().as_uri() + "?mode=ro"
+                conn = sqlite3.connect(uri, uri=True, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE)
+            else:
+                conn = sqlite3.connect(self.path, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Run the enclosed statements as one transaction, rolled back on error."""
+        conn = self.connection()
+        if self._local.depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.depth += 1
+        try:
+            yield conn
+        except BaseException:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                conn.execute("ROLLBACK")
+            raise
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            conn.execute("COMMIT")
+
+    def execute(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+@functools.lru_cache(maxsize=None)
+def _database(path):
+    return Database(path)
+
+
+def get_db(path=None):
+    """Shared Database for path (DB_NAME by default, read at call time)."""
+    return _database(path or DB_NAME)
+
+
+def transaction():
+    """Group task operations into a single transaction:
+
+        with transaction():
+            for task_id in ids:
+                update_task(task_id, "Done", verbose=False)
+    """
+    return get_db().transaction()
+
+
+def _strptime(text, fmt):
+    try:
+        return datetime.strptime(text, fmt).date()
+    except ValueError:
+        return None
+
+
+def parse_due_date(text):
+    """Normalize a due date to ISO YYYY-MM-DD (None if blank); ValueError if unparsable or ambiguous."""
+    text = (text or "").strip()
+    if not text:
+        return None
+    for fmt in DATE_FORMATS:
+        date = _strptime(text, fmt)
+        if date:
+            return date.isoformat()
+    for formats in DAY_MONTH_FORMATS:
+        dates = {date for date in (_strptime(text, fmt) for fmt in formats) if date}
+        if len(dates) == 1:
+            return dates.pop().isoformat()
+        if dates:
+            raise ValueError(f"Ambiguous due date '{text}' (day or month first?), expected YYYY-MM-DD")
+    raise ValueError(f"Unrecognized due date '{text}', expected YYYY-MM-DD")
+
+
+def _create_tasks(conn):
+    conn.execute(
         """
         CREATE TABLE IF NOT EXISTS tasks (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -19,55 +145,351 @@ def init_db():
         )
         """
     )
-    conn.commit()
-    conn.close()
 
 
-def add_task(title, description, due_date):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO tasks (title, description, due_date) VALUES (?, ?, ?)",
-        (title, description, due_date),
+def _iso_due_dates(conn):
+    # due dates used to be free text; rewrite them as ISO dates so they sort,
+    # moving anything unparsable into the description instead of dropping it
+    rows = conn.execute(
+        "SELECT id, due_date FROM tasks WHERE due_date IS NOT NULL "
+        "AND due_date NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+    ).fetchall()
+    fixed, unparsable = [], []
+    for task_id, text in rows:
+        try:
+            fixed.append((parse_due_date(text), task_id))
+        except ValueError:
+            unparsable.append((f" (due: {text})", task_id))
+    conn.executemany("UPDATE tasks SET due_date=? WHERE id=?", fixed)
+    conn.executemany(
+        "UPDATE tasks SET due_date=NULL, description=coalesce(description, '') || ? WHERE id=?", unparsable
+    )
+
+
+def _index_tasks(conn):
+    # the rowid (id) is the implicit last column of both, so they also serve ORDER BY due_date, id
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_due ON tasks (status, due_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks (due_date)")
+
+
+def _search_index(conn):
+    # external content table: the FTS index stores only the tokens, the text stays in tasks
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+        "title, description, content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    # one statement per execute(): executescript() would commit the migration's transaction
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+        """
+    )
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+# schema version N is reached by running MIGRATIONS[N - 1]; the version is kept in PRAGMA user_version
+MIGRATIONS = [_create_tasks, _iso_due_dates, _index_tasks, _search_index]
+
+
+def init_db():
+    """Initialize the database and bring its schema up to date."""
+    with transaction() as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            migration(conn)
+            conn.execute(f"PRAGMA user_version={number}")
+
+
+def add_task(title, description, due_date, verbose=True):
+    """Add a task and return its id."""
+    due_date = parse_due_date(due_date)
+    with transaction() as conn:
+        cursor = conn.execute(
+            "INSERT INTO tasks (title, description, due_date) VALUES (?, ?, ?)",
+            (title, description, due_date),
+        )
+    if verbose:
+        print("Task added successfully")
+    return cursor.lastrowid
+
+
+def fetch_page(status=None, due_from=None, due_to=None, exclude_status=None, after=None, page_size=PAGE_SIZE,
+               db=None):
+    """Return up to page_size tasks ordered by (due_date, id), starting after the `after` key.
+
+    status / exclude_status filter on the status, due_from / due_to select
+    due dates in [due_from, due_to). `after` is the (due_date, id) of the
+    last task of the previous page, so each page is an index seek rather
+    than an OFFSET scan. Tasks without a due date come first. db defaults
+    to get_db().
+    """
+    where, params = [], []
+    if status is not None:
+        where.append("status = ?")
+        params.append(status)
+    if exclude_status is not None:
+        where.append("status != ?")
+        params.append(exclude_status)
+    if due_from is not None:
+        where.append("due_date >= ?")
+        params.append(due_from)
+    if due_to is not None:
+        where.append("due_date < ?")
+        params.append(due_to)
+    if after is not None:
+        after_due, after_id = after
+        if after_due is None:
+            where.append("((due_date IS NULL AND id > ?) OR due_date IS NOT NULL)")
+            params.append(after_id)
+        else:
+            where.append("(due_date, id) > (?, ?)")
+            params.extend(after)
+
+    sql = "SELECT id, title, description, due_date, status FROM tasks"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY due_date, id LIMIT ?"
+    cursor = (db or get_db()).execute(sql, (*params, page_size))
+    return [Task._make(row) for row in cursor]
+
+
+def iter_tasks(status=None, due_from=None, due_to=None, exclude_status=None, page_size=PAGE_SIZE):
+    """Yield matching tasks lazily, one page_size query at a time (see fetch_page)."""
+    after = None
+    while True:
+        page = fetch_page(status, due_from, due_to, exclude_status, after, page_size)
+        yield from page
+        if len(page) < page_size:
+            return
+        after = (page[-1].due_date, page[-1].id)
+
+
+def overdue_tasks(today=None):
+    """Tasks not Done whose due date has passed."""
+    today = today or date.today()
+    return iter_tasks(due_to=today.isoformat(), exclude_status="Done")
+
+
+def this_week(today=None):
+    """ISO [from, to) bounds covering today up to and including Sunday."""
+    today = today or date.today()
+    monday = today + timedelta(days=7 - today.weekday())
+    return today.isoformat(), monday.isoformat()
+
+
+def due_this_week(today=None):
+    """Tasks not Done due from today up to and including Sunday."""
+    due_from, due_to = this_week(today)
+    return iter_tasks(due_from=due_from, due_to=due_to, exclude_status="Done")
+
+
+def _match_expression(query, prefix):
+    # quote every word so FTS5 operators and punctuation in the input are taken literally
+    terms = ['"' + word.replace('"', '""') + '"' + ("*" if prefix else "") for word in query.split()]
+    return " ".join(terms)
+
+
+def search_tasks(query, limit=SEARCH_LIMIT, prefix=True, db=None):
+    """Return the tasks matching every word of query, best bm25 match first.
+
+    With prefix=True each word also matches longer words starting with it
+    ("rep" finds "report"). Each result carries a snippet of the matching
+    text with the hits wrapped in [ ].
+    """
+    match = _match_expression(query, prefix)
+    if not match:
+        return []
+    cursor = (db or get_db()).execute(
+        """
+        SELECT t.id, t.title, t.description, t.due_date, t.status,
+               bm25(tasks_fts, ?, ?) AS rank,
+               snippet(tasks_fts, -1, '[', ']', '...', 12)
+        FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid
+        WHERE tasks_fts MATCH ?
+        ORDER BY rank
+        LIMIT ?
+        """,
+        (TITLE_WEIGHT, DESCRIPTION_WEIGHT, match, limit),
     )
-    conn.commit()
-    conn.close()
-    print("Task added successfully")
+    return [SearchResult(Task._make(row[:5]), row[5], row[6]) for row in cursor]
+
 
+def view_search(query):
+    results = search_tasks(query)
+    if not results:
+        print("No matching tasks.")
+        return
+    print(f"\n=== Tasks matching '{query}' ===")
+    for task, _, snippet in results:
+        print(f"[{task.id}] {task.title} (Due: {task.due_date}) - {task.status} \n   {snippet}")
 
-def view_tasks():
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM tasks")
-    tasks = cursor.fetchall()
-    conn.close()
 
-    if not tasks:
+def view_tasks(tasks=None, title="Your Tasks"):
+    found = False
+    for task in iter_tasks() if tasks is None else tasks:
+        if not found:
+            print(f"\n=== {title} ===")
+            found = True
+        print(
+            f"[{task.id}] {task.title} (Due: {task.due_date}) - {task.status} \n   {task.description}"
+        )
+    if not found:
         print("No tasks found.")
-    else:
-        print("\n=== Your Tasks ===")
-        for task in tasks:
-            print(
-                f"[{task[0]}] {task[1]} (Due: {task[3]}) - {task[4]} \n   {task[2]}"
-            )
 
 
-def update_task(task_id, new_status):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("UPDATE tasks SET status=? WHERE id=?", (new_status, task_id))
-    conn.commit()
-    conn.close()
-    print("Task updated successfully")
+def update_task(task_id, new_status, verbose=True):
+    """Set a task's status; returns False if there is no such task."""
+    with transaction() as conn:
+        cursor = conn.execute("UPDATE tasks SET status=? WHERE id=?", (new_status, task_id))
+    if verbose:
+        print("Task updated successfully")
+    return cursor.rowcount > 0
+
+
+def delete_task(task_id, verbose=True):
+    """Delete a task; returns False if there is no such task."""
+    with transaction() as conn:
+        cursor = conn.execute("DELETE FROM tasks WHERE id=?", (task_id,))
+    if verbose:
+        print("🗑️ Task deleted successfully")
+    return cursor.rowcount > 0
+
+
+def add_tasks(tasks, verbose=True):
+    """Insert many (title, description, due_date) tasks in one transaction."""
+    rows = [(title, description, parse_due_date(due_date)) for title, description, due_date in tasks]
+    with transaction() as conn:
+        conn.executemany("INSERT INTO tasks (title, description, due_date) VALUES (?, ?, ?)", rows)
+    if verbose:
+        print(f"{len(rows)} tasks added successfully")
+    return len(rows)
+
+
+def update_tasks(task_ids, new_status, verbose=True):
+    """Set the status of many tasks in one transaction; returns how many tasks existed."""
+    rows = [(new_status, task_id) for task_id in dict.fromkeys(task_ids)]
+    with transaction() as conn:
+        cursor = conn.executemany("UPDATE tasks SET status=? WHERE id=?", rows)
+    if verbose:
+        print(f"{cursor.rowcount} tasks updated successfully")
+    return cursor.rowcount
+
+
+def delete_tasks(task_ids, verbose=True):
+    """Delete many tasks in one transaction; returns how many tasks existed."""
+    rows = [(task_id,) for task_id in task_ids]
+    with transaction() as conn:
+        cursor = conn.executemany("DELETE FROM tasks WHERE id=?", rows)
+    if verbose:
+        print(f"🗑️ {cursor.rowcount} tasks deleted successfully")
+    return cursor.rowcount
+
+
+class WriteBehindQueue:
+    """Queue task writes and apply them from a background thread in grouped commits.
 
+    add_task / update_task / delete_task return immediately. The writer
+    thread takes everything queued so far (up to batch_size operations) and
+    applies it in one transaction, running consecutive operations of the
+    same kind through a single executemany. Repeated status updates of the
+    same task within a batch collapse into the last one.
 
-def delete_task(task_id):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM tasks WHERE id=?", (task_id,))
-    conn.commit()
-    conn.close()
-    print("🗑️ Task deleted successfully")
+    flush() blocks until every queued write is committed and re-raises a
+    failed batch's error. close() flushes and stops the thread; it is also
+    registered to run at exit.
+    """
+
+    def __init__(self, batch_size=WRITE_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="task-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add_task(self, title, description, due_date):
+        # validated here so a bad date is reported to the caller, not the writer thread
+        self.queue.put(("add", (title, description, parse_due_date(due_date))))
+
+    def update_task(self, task_id, new_status):
+        self.queue.put(("update", (new_status, task_id)))
+
+    def delete_task(self, task_id):
+        self.queue.put(("delete", (task_id,)))
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            try:
+                self._apply([op for op in batch if op is not None])
+            except Exception as e:
+                self.error = e
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                get_db().close()
+                return
+
+    @staticmethod
+    def _apply(batch):
+        sql = {
+            "add": "INSERT INTO tasks (title, description, due_date) VALUES (?, ?, ?)",
+            "update": "UPDATE tasks SET status=? WHERE id=?",
+            "delete": "DELETE FROM tasks WHERE id=?",
+        }
+        with transaction() as conn:
+            i = 0
+            while i < len(batch):
+                kind = batch[i][0]
+                j = i
+                while j < len(batch) and batch[j][0] == kind:
+                    j += 1
+                rows = [params for _, params in batch[i:j]]
+                if kind == "update":
+                    # last status wins; dict keeps the first-seen order of task ids
+                    rows = [(status, task_id) for task_id, status in
+                            {task_id: status for status, task_id in rows}.items()]
+                conn.executemany(sql[kind], rows)
+                i = j
+
+    def flush(self):
+        """Wait until every queued write is committed."""
+        self.queue.join()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def close(self):
+        if self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join()
+        atexit.unregister(self.close)
+        self.flush()
 
 
 def main():
@@ -79,18 +501,25 @@ def main():
         print("2. View Tasks")
         print("3. Update Task Status")
         print("4. Delete Task")
-        print("5. Exit")
+        print("5. Overdue Tasks")
+        print("6. Due This Week")
+        print("7. Search Tasks")
+        print("8. Exit")
 
-        choice = input("Choose an option (1-5): ")
+        choice = input("Choose an option (1-8): ")
 
         if choice == "1":
             title = input("Enter task title: ")
             description = input("Enter description: ")
             due_date = input("Enter due date (YYYY-MM-DD): ")
-            add_task(title, description, due_date)
+            try:
+                add_task(title, description, due_date)
+            except ValueError as e:
+                print(e)
 
         elif choice == "2":
-            view_tasks()
+            status = input("Filter by status (blank for all): ").strip()
+            view_tasks(iter_tasks(status=status or None))
 
         elif choice == "3":
             task_id = int(input("Enter task ID to update: "))
@@ -102,6 +531,16 @@ def main():
             delete_task(task_id)
 
         elif choice == "5":
+            view_tasks(overdue_tasks(), "Overdue Tasks")
+
+        elif choice == "6":
+            view_tasks(due_this_week(), "Due This Week")
+
+        elif choice == "7":
+            view_search(input("Search for: "))
+
+        elif choice == "8":
+            get_db().close()
             print("Goodbye")
             break
 
@@ -0,0 +1,264 @@
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import json
+import signal
+import sys
+import time
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+import task_manager as tm
+
+
+HOST = "127.0.0.1"
+PORT = 8765
+READERS = 4
+LATENCY_SAMPLES = 10_000
+MAX_BODY = 1 << 20
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class TaskServer:
+    """Serve the tasks database to many local clients as JSON over HTTP/1.1.
+
+    Reads run on a pool of `readers` threads, each with its own read-only
+    WAL connection, so they proceed concurrently with each other and with
+    writes. Writes go through one asyncio queue to a single writer thread
+    that owns the only read-write connection; everything queued by the time
+    the writer is free is committed together, each request in its own
+    savepoint so one failing request does not undo the others.
+
+    Routes:
+      GET    /tasks?status=&exclude_status=&due_from=&due_to=&after_due=&after_id=&limit=
+      GET    /tasks/overdue, /tasks/week   (same paging parameters)
+      GET    /search?q=&limit=
+      POST   /tasks            {"title", "description", "due_date"}
+      PATCH  /tasks/<id>       {"status"}
+      DELETE /tasks/<id>
+      GET    /metrics          per-route request count and latency percentiles
+    """
+
+    def __init__(self, path=tm.DB_NAME, readers=READERS, write_batch=tm.WRITE_BATCH_SIZE):
+        self.path = path
+        self.write_batch = write_batch
+        self.read_db = tm.Database(path, readonly=True)
+        self.read_pool = concurrent.futures.ThreadPoolExecutor(readers, thread_name_prefix="task-reader")
+        self.write_pool = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="task-writer")
+        self.latency = collections.defaultdict(lambda: collections.deque(maxlen=LATENCY_SAMPLES))
+        self.requests = collections.Counter()
+        self.writes = None
+
+    async def start(self, host=HOST, port=PORT, unix_path=None):
+        # the task functions write through get_db(), i.e. DB_NAME, on the writer thread
+        tm.DB_NAME = self.path
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.write_pool, tm.init_db)
+        self.writes = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer())
+        if unix_path:
+            return await asyncio.start_unix_server(self._handle, path=unix_path)
+        return await asyncio.start_server(self._handle, host, port)
+
+    def close(self):
+        self.read_pool.shutdown()
+        self.write_pool.submit(tm.get_db().close).result()
+        self.write_pool.shutdown()
+
+    async def _writer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.writes.get()]
+            while len(batch) < self.write_batch and not self.writes.empty():
+                batch.append(self.writes.get_nowait())
+            try:
+                results = await loop.run_in_executor(self.write_pool, self._apply, [call for call, _ in batch])
+            except Exception as e:
+                results = [(False, e)] * len(batch)
+            for (_, future), (ok, value) in zip(batch, results):
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    @staticmethod
+    def _apply(calls):
+        results = []
+        with tm.transaction() as conn:
+            for call in calls:
+                conn.execute("SAVEPOINT request")
+                try:
+                    results.append((True, call()))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO request")
+                    results.append((False, e))
+                conn.execute("RELEASE request")
+        return results
+
+    async def write(self, func, *args, **kwargs):
+        future = asyncio.get_running_loop().create_future()
+        await self.writes.put((functools.partial(func, *args, verbose=False, **kwargs), future))
+        return await future
+
+    async def read(self, func, *args, **kwargs):
+        call = functools.partial(func, *args, db=self.read_db, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.read_pool, call)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                start = time.perf_counter()
+                route = "error"
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY:
+                        raise HTTPError(413, "Request body too large")
+                    body = await reader.readexactly(length) if length else b""
+                    route, status, payload = await self._dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except KeyError as e:
+                    status, payload = 400, {"error": f"Missing field {e}"}
+                except (ValueError, asyncio.IncompleteReadError) as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+                data = json.dumps(payload).encode()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                self.requests[route] += 1
+                self.latency[route].append(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = [p for p in url.path.split("/") if p]
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        data = json.loads(body) if body else {}
+
+        if parts == ["metrics"] and method == "GET":
+            return "GET /metrics", 200, self.metrics()
+        if parts == ["search"] and method == "GET":
+            results = await self.read(tm.search_tasks, query.get("q", ""), int(query.get("limit", tm.SEARCH_LIMIT)))
+            return "GET /search", 200, [
+                {**r.task._asdict(), "rank": r.rank, "snippet": r.snippet} for r in results
+            ]
+        if parts and parts[0] == "tasks":
+            if len(parts) == 1 and method == "GET":
+                return "GET /tasks", 200, await self._page(query)
+            if len(parts) == 2 and parts[1] in ("overdue", "week") and method == "GET":
+                if parts[1] == "overdue":
+                    bounds = {"due_to": date.today().isoformat()}
+                else:
+                    due_from, due_to = tm.this_week()
+                    bounds = {"due_from": due_from, "due_to": due_to}
+                query.update(bounds, exclude_status="Done")
+                return f"GET /tasks/{parts[1]}", 200, await self._page(query)
+            if len(parts) == 1 and method == "POST":
+                task_id = await self.write(tm.add_task, data["title"], data.get("description", ""),
+                                           data.get("due_date"))
+                return "POST /tasks", 201, {"id": task_id}
+            if len(parts) == 2 and method in ("PATCH", "DELETE"):
+                task_id = int(parts[1])
+                if method == "PATCH":
+                    found = await self.write(tm.update_task, task_id, data["status"])
+                else:
+                    found = await self.write(tm.delete_task, task_id)
+                if not found:
+                    raise HTTPError(404, f"No task {task_id}")
+                return f"{method} /tasks/<id>", 200, {"id": task_id}
+            raise HTTPError(405, f"{method} not allowed on {url.path}")
+        raise HTTPError(404, f"No route {url.path}")
+
+    async def _page(self, query):
+        after = None
+        if "after_id" in query:
+            after = (query.get("after_due") or None, int(query["after_id"]))
+        tasks = await self.read(
+            tm.fetch_page,
+            status=query.get("status"),
+            due_from=query.get("due_from"),
+            due_to=query.get("due_to"),
+            exclude_status=query.get("exclude_status"),
+            after=after,
+            page_size=min(int(query.get("limit", tm.PAGE_SIZE)), 1000),
+        )
+        return [task._asdict() for task in tasks]
+
+    def metrics(self):
+        """Request count and p50/p99/max latency in ms per route, over the last LATENCY_SAMPLES requests."""
+        metrics = {}
+        for route, samples in sorted(self.latency.items()):
+            ms = np.array(samples) * 1000
+            metrics[route] = {
+                "requests": self.requests[route],
+                "p50_ms": float(np.percentile(ms, 50)),
+                "p99_ms": float(np.percentile(ms, 99)),
+                "max_ms": float(ms.max()),
+            }
+        return metrics
+
+
+async def serve(path=tm.DB_NAME, host=HOST, port=PORT, unix_path=None, readers=READERS):
+    """Run a TaskServer until SIGINT or SIGTERM, then print its latency metrics."""
+    server = TaskServer(path, readers)
+    listener = await server.start(host, port, unix_path)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    print(f"Serving {path} on {unix_path or f'http://{host}:{port}'}", flush=True)
+    async with listener:
+        await stop.wait()
+    server.close()
+    print(json.dumps(server.metrics(), indent=2))
+
+
+def main():
+    # task_server.py [PORT | unix:PATH] [DB]
+    port, unix_path = PORT, None
+    if len(sys.argv) > 1:
+        if sys.argv[1].startswith("unix:"):
+            unix_path = sys.argv[1][len("unix:"):]
+        else:
+            port = int(sys.argv[1])
+    path = sys.argv[2] if len(sys.argv) > 2 else tm.DB_NAME
+    asyncio.run(serve(path, port=port, unix_path=unix_path))
+
+
+if __name__ == "__main__":
+    main()
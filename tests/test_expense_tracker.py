@@ -0,0 +1,190 @@
+import json
+import random
+import sys
+
+import pandas as pd
+import pytest
+
+import expense_tracker
+
+
+CATEGORIES = ["Food", "Rent", "Transport", "Fun"]
+
+
+@pytest.fixture
+def ledger_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(expense_tracker, "COMPACT_EVERY", 150)
+    return {
+        "file_name": str(tmp_path / "expenses.csv"),
+        "journal_name": str(tmp_path / "expenses.journal"),
+        "aggregates_name": str(tmp_path / "expenses.aggregates.json"),
+    }
+
+
+def random_rows(rng, n):
+    return [{
+        "Date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "Category": rng.choice(CATEGORIES),
+        "Amount": rng.uniform(0.5, 250),
+        "Note": rng.choice(["", "lunch", "card, online"]),
+    } for _ in range(n)]
+
+
+def assert_totals_match(ledger):
+    expenses = ledger.to_frame()
+    amounts = expenses["Amount"].round(2)
+    by_category = amounts.groupby(expenses["Category"].astype(str)).sum().round(2)
+    by_month = amounts.groupby(expenses["Date"].dt.strftime("%Y-%m")).sum().round(2)
+    for totals, expected in [(ledger.category_totals(), by_category), (ledger.month_totals(), by_month)]:
+        pd.testing.assert_series_equal(totals, expected, check_names=False, check_index_type=False, check_exact=True)
+
+
+def test_incremental_totals_match_full_recompute(ledger_paths):
+    rng = random.Random(0)
+    ledger = expense_tracker.ExpenseJournal(flush_every=7, **ledger_paths)
+    for row in random_rows(rng, 400):  # crosses COMPACT_EVERY twice
+        ledger.append(row)
+    ledger.flush()
+    assert_totals_match(ledger)
+
+    ledger.compact()
+    ledger.extend(random_rows(rng, 50))
+    assert_totals_match(ledger)
+
+    reopened = expense_tracker.ExpenseJournal(**ledger_paths)
+    assert reopened.aggregates["rows"] == 450
+    assert_totals_match(reopened)
+
+    # the incrementally maintained totals are exactly what a rebuild gives
+    maintained = json.loads(json.dumps(reopened.aggregates))
+    reopened.rebuild_aggregates()
+    assert reopened.aggregates == maintained
+
+
+def test_stale_aggregates_are_rebuilt(ledger_paths):
+    rng = random.Random(1)
+    ledger = expense_tracker.ExpenseJournal(**ledger_paths)
+    ledger.extend(random_rows(rng, 40))
+    # saved totals that cover fewer rows than the ledger, as after a crash between writes
+    ledger.aggregates = {"rows": 3, "category": {"Food": 1.0}, "month": {}}
+    ledger._save_aggregates()
+
+    assert_totals_match(expense_tracker.ExpenseJournal(**ledger_paths))
+
+
+def test_torn_journal_tail_is_cut_before_the_next_append(ledger_paths):
+    rng = random.Random(2)
+    rows = random_rows(rng, 5)
+    ledger = expense_tracker.ExpenseJournal(**ledger_paths)
+    ledger.extend(rows[:4])
+    # a crash part way through writing a row
+    with open(ledger_paths["journal_name"], "a", encoding="utf-8") as f:
+        f.write("2025-02-01,Fo")
+
+    reopened = expense_tracker.ExpenseJournal(**ledger_paths)
+    assert len(reopened.rows) == 4
+    reopened.append(rows[4])
+
+    final = expense_tracker.ExpenseJournal(**ledger_paths)
+    assert final.rows == rows
+    assert final.aggregates["rows"] == 5
+    assert_totals_match(final)
+
+
+def test_compaction_keeps_amounts_to_the_cent(ledger_paths, tmp_path):
+    row = {"Date": "2025-01-15", "Category": "Rent", "Amount": 1234567.89, "Note": ""}
+    ledger = expense_tracker.ExpenseJournal(**ledger_paths)
+    ledger.append(row)
+    ledger.compact()
+
+    reopened = expense_tracker.ExpenseJournal(**ledger_paths)
+    assert reopened.to_frame()["Amount"].tolist() == [1234567.89]
+    assert "1234567.89" in open(ledger_paths["file_name"], encoding="utf-8").read()
+
+    export = tmp_path / "export.csv"
+    pd.DataFrame([row]).to_csv(export, index=False)
+    assert reopened.import_csv(str(export))["duplicates"] == 1
+    assert len(reopened.to_frame()) == 1
+
+
+BANK_COLUMNS = {"Booking date": "Date", "Type": "Category", "Value": "Amount", "Reference": "Note"}
+
+
+def write_bank_export(path, rows):
+    pd.DataFrame(rows, columns=list(BANK_COLUMNS)).to_csv(path, index=False)
+
+
+def test_import_dedups_and_reimport_adds_nothing(ledger_paths, tmp_path):
+    export = tmp_path / "bank.csv"
+    write_bank_export(export, [
+        ("2025-01-03", "Food", "12.50", "lunch"),
+        ("2025-01-03", "Food", "12.50", "lunch"),  # genuinely bought twice
+        ("2025-01-09", "Rent", "900", ""),
+        ("not a date", "Food", "1", ""),
+        ("2025-01-10", "", "5", ""),
+    ])
+    ledger = expense_tracker.ExpenseJournal(**ledger_paths)
+    ledger.append({"Date": "2025-01-09", "Category": "Rent", "Amount": 900.0, "Note": ""})
+
+    stats = ledger.import_csv(str(export), BANK_COLUMNS)
+    assert stats == {"rows": 5, "imported": 2, "duplicates": 1, "invalid": 2}
+    assert ledger.import_csv(str(export), BANK_COLUMNS) == {"rows": 5, "imported": 0, "duplicates": 3, "invalid": 2}
+
+    reopened = expense_tracker.ExpenseJournal(**ledger_paths)
+    assert len(reopened.to_frame()) == 3
+    assert reopened.import_csv(str(export), BANK_COLUMNS)["imported"] == 0
+    assert_totals_match(reopened)
+
+
+def test_import_reports_missing_columns(ledger_paths, tmp_path):
+    export = tmp_path / "bank.csv"
+    write_bank_export(export, [("2025-01-03", "Food", "12.50", "")])
+    ledger = expense_tracker.ExpenseJournal(**ledger_paths)
+    with pytest.raises(ValueError, match="missing column.*Date, Category, Amount"):
+        ledger.import_csv(str(export))
+    assert ledger.aggregates["rows"] == 0
+
+
+def test_cli_import_with_column_map(ledger_paths, tmp_path, monkeypatch, capsys):
+    export = tmp_path / "bank.csv"
+    write_bank_export(export, [("2025-01-03", "Food", "12.50", ""), ("2025-01-04", "Fun", "3", "")])
+    monkeypatch.setattr(expense_tracker, "load_expenses", lambda: expense_tracker.ExpenseJournal(**ledger_paths))
+    spec = ",".join(f"{source}={target}" for source, target in BANK_COLUMNS.items())
+    monkeypatch.setattr(sys, "argv", ["expense_tracker.py", "--import", "--map", spec, str(export)])
+    expense_tracker.main()
+    assert "2 imported" in capsys.readouterr().out
+
+    monkeypatch.setattr(sys, "argv", ["expense_tracker.py", "--import", str(export)])
+    expense_tracker.main()
+    assert "missing column(s) Date, Category, Amount" in capsys.readouterr().out
+
+
+def test_parse_column_map_rejects_unknown_targets():
+    assert expense_tracker.parse_column_map(" Booking date = Date ,Value=Amount") == {"Booking date": "Date", "Value": "Amount"}
+    with pytest.raises(ValueError):
+        expense_tracker.parse_column_map("Value=Betrag")
+
+
+def test_query_date_ranges(ledger_paths):
+    rng = random.Random(3)
+    rows = random_rows(rng, 300)
+    ledger = expense_tracker.ExpenseJournal(flush_every=50, **ledger_paths)
+    for row in rows[:200]:
+        ledger.append(row)
+    ledger.query("2025-03-01", "2025-04-01")  # build the date index, then add out-of-order rows
+    ledger.extend(rows[200:])
+    expenses = ledger.to_frame()
+
+    for start, end, category in [("2025-03-01", "2025-04-01", None), ("2025-06-15", "2025-06-16", "Food"),
+                                 (None, "2025-02-01", None), ("2025-12-01", None, "Rent"), (None, None, None),
+                                 ("2025-05-01", "2025-05-01", None)]:
+        result = ledger.query(start, end, category)
+        mask = pd.Series(True, index=expenses.index)
+        if start is not None:
+            mask &= expenses["Date"] >= start
+        if end is not None:
+            mask &= expenses["Date"] < end
+        if category is not None:
+            mask &= expenses["Category"] == category
+        assert sorted(result.index) == sorted(expenses.index[mask])
+        assert result["Date"].is_monotonic_increasing
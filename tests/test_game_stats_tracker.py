@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from game_stats_tracker import chunks_from_file, iter_app_objects, iter_games
+
+
+CATALOG = {
+    "10": {"name": "Counter-Strike", "owners": "10,000,000 .. 20,000,000", "average_forever": 9000},
+    "20": {"name": "Team \"Fortress\" Classic", "owners": "1,000,000 .. 2,000,000", "average_forever": "15"},
+    "30": {"name": "Ünïcödé {braces}, commas: and colons", "owners": "0 .. 20,000"},
+}
+
+
+@pytest.fixture
+def payload(tmp_path):
+    path = tmp_path / "all.json"
+    path.write_text(json.dumps(CATALOG, indent=1, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_iter_games_across_chunk_boundaries(payload, chunk_size):
+    records = list(iter_games(chunks_from_file(payload, chunk_size)))
+    assert records == [
+        (appid, game["name"], game["owners"], int(game.get("average_forever", 0)))
+        for appid, game in CATALOG.items()
+    ]
+
+
+def test_iter_app_objects_rejects_truncated_payload():
+    text = json.dumps(CATALOG)
+    with pytest.raises(ValueError):
+        list(iter_app_objects(iter([text[:len(text) // 2]])))
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import IndicatorEngine, compute_batch
+from stock_prediction import preprocess_data, preprocess_many, update_features
+
+
+def random_close(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+
+def pandas_indicators(close: np.ndarray) -> dict:
+    """The pandas formulas from the IndicatorEngine docstring."""
+    close = pd.Series(close)
+    ret = close.pct_change()
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    loss = (-delta).clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    rsi = (100 - 100 / (1 + gain / loss)).where(loss != 0, 100.0).where(gain.notna())
+    return {
+        "Return": ret,
+        "SMA_10": close.rolling(10).mean(),
+        "SMA_50": close.rolling(50).mean(),
+        "EMA_20": close.ewm(span=20, adjust=False).mean(),
+        "RSI_14": rsi,
+        "Volatility_20": ret.rolling(20).std(),
+    }
+
+
+def assert_matches(features, expected):
+    assert set(features) == set(expected)
+    for name, values in expected.items():
+        np.testing.assert_allclose(np.asarray(features[name], dtype=float), values.to_numpy(),
+                                   rtol=1e-10, atol=1e-10, err_msg=name)
+
+
+def test_compute_batch_matches_pandas():
+    close = random_close()
+    assert_matches(compute_batch(close), pandas_indicators(close))
+
+
+def test_streaming_matches_pandas():
+    close = random_close()
+    rows = IndicatorEngine().update_many(close)
+    assert_matches(pd.DataFrame(rows).to_dict("series"), pandas_indicators(close))
+
+
+@pytest.mark.parametrize("split", [1, 30, 200])
+def test_checkpoint_restore_midway(tmp_path, split):
+    close = random_close()
+    engine = IndicatorEngine()
+    first = engine.update_many(close[:split])
+    engine.save(tmp_path / "engine.json")
+    rest = IndicatorEngine.load(tmp_path / "engine.json").update_many(close[split:])
+    assert_matches(pd.DataFrame(first + rest).to_dict("series"), pandas_indicators(close))
+
+
+def test_update_features_appends_to_checkpoint(tmp_path):
+    close = random_close(120)
+    bars = pd.DataFrame({"Close": close}, index=pd.bdate_range("2024-01-01", periods=len(close)))
+    checkpoint = str(tmp_path / "AAPL.json")
+    streamed = pd.concat([update_features(bars.iloc[:70], checkpoint), update_features(bars.iloc[70:], checkpoint)])
+    expected = pandas_indicators(close)
+    for name in ["Return", "SMA_10", "SMA_50", "RSI_14"]:
+        np.testing.assert_allclose(streamed[name].to_numpy(), expected[name].to_numpy(), rtol=1e-10, err_msg=name)
+
+
+def old_preprocess(data):
+    data["Return"] = data["Close"].pct_change()
+    data["SMA_10"] = data["Close"].rolling(window=10).mean()
+    data["SMA_50"] = data["Close"].rolling(window=50).mean()
+    data["Target"] = (data["Return"].shift(-1) > 0).astype(int)
+    return data.dropna()
+
+
+def test_preprocess_data_unchanged():
+    close = random_close()
+    data = pd.DataFrame({"Close": close, "Volume": 1}, index=pd.bdate_range("2020-01-01", periods=len(close)))
+    pd.testing.assert_frame_equal(preprocess_data(data.copy()), old_preprocess(data.copy()), rtol=1e-12)
+
+
+def test_preprocess_many_matches_per_ticker():
+    dates = pd.bdate_range("2020-01-01", periods=300)
+    frames = {
+        "AAA": pd.DataFrame({"Close": random_close(300, 1)}, index=dates),
+        # a ticker listed later, so the wide frame has leading NaN prices
+        "BBB": pd.DataFrame({"Close": random_close(200, 2)}, index=dates[100:]),
+        # missing bars in the middle of the series, including one within the first 50
+        "CCC": pd.DataFrame({"Close": random_close(297, 3)}, index=dates.delete([30, 150, 151])),
+    }
+    data = pd.concat(frames, names=["Ticker", "Date"]).swaplevel().sort_index()
+    many = preprocess_many(data)
+    for ticker, frame in frames.items():
+        expected = old_preprocess(frame.copy())
+        got = many.xs(ticker, level="Ticker")[expected.columns]
+        pd.testing.assert_frame_equal(got, expected, check_names=False, check_freq=False, rtol=1e-12)
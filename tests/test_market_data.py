@@ -0,0 +1,78 @@
+import pandas as pd
+
+from market_data import PRICE_COLUMNS, CSVProvider, OHLCVStore
+
+
+def write_fixture(directory, ticker, days=30):
+    dates = pd.bdate_range("2024-01-02", periods=days, name="Date")
+    close = pd.Series(range(100, 100 + days), index=dates, dtype=float)
+    frame = pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000})
+    frame.to_csv(directory / f"{ticker}.csv")
+
+
+def test_get_returns_bars(tmp_path):
+    write_fixture(tmp_path, "AAA")
+    store = OHLCVStore(str(tmp_path / "store.db"), provider=CSVProvider(str(tmp_path)))
+    data = store.get("AAA", "2024-01-01", "2024-01-10")
+    assert list(data.columns) == PRICE_COLUMNS
+    assert len(data) == 6
+    store.close()
+
+
+def test_get_unknown_ticker_is_empty(tmp_path):
+    store = OHLCVStore(str(tmp_path / "store.db"), provider=CSVProvider(str(tmp_path)))
+    data = store.get("ZZZ", "2024-01-01", "2024-02-01")
+    assert data.empty
+    assert list(data.columns) == PRICE_COLUMNS
+    store.close()
+
+
+class CountingProvider(CSVProvider):
+    """CSVProvider that records every (tickers, start, end) it is asked for."""
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.calls = []
+
+    def fetch_many(self, tickers, start, end):
+        self.calls.append((tuple(tickers), start, end))
+        return super().fetch_many(tickers, start, end)
+
+
+def stored_rows(store, ticker):
+    return store.conn.execute("SELECT count(*), count(DISTINCT date) FROM ohlcv WHERE ticker=?", (ticker,)).fetchone()
+
+
+def test_overlapping_get_fetches_only_missing_range(tmp_path):
+    write_fixture(tmp_path, "AAA", days=60)
+    fixture = pd.read_csv(tmp_path / "AAA.csv", index_col="Date", parse_dates=True)[PRICE_COLUMNS]
+    provider = CountingProvider(str(tmp_path))
+    store = OHLCVStore(str(tmp_path / "store.db"), provider=provider)
+
+    store.get("AAA", "2024-01-01", "2024-01-20")
+    assert provider.calls == [(("AAA",), "2024-01-01", "2024-01-20")]
+
+    data = store.get("AAA", "2024-01-10", "2024-02-15")
+    assert provider.calls[1:] == [(("AAA",), "2024-01-20", "2024-02-15")]
+    expected = fixture[(fixture.index >= "2024-01-10") & (fixture.index < "2024-02-15")]
+    pd.testing.assert_frame_equal(data, expected, check_dtype=False, check_freq=False)
+    stored = len(fixture[fixture.index < "2024-02-15"])
+    assert stored_rows(store, "AAA") == (stored, stored)
+
+    # fully covered now, and an earlier start only fetches up to the old start
+    store.get("AAA", "2024-01-05", "2024-02-01")
+    store.get("AAA", "2023-12-01", "2024-01-05")
+    assert provider.calls[2:] == [(("AAA",), "2023-12-01", "2024-01-01")]
+    assert stored_rows(store, "AAA") == (stored, stored)
+    store.close()
+
+
+def test_upsert_replaces_rows_instead_of_duplicating(tmp_path):
+    write_fixture(tmp_path, "AAA", days=10)
+    store = OHLCVStore(str(tmp_path / "store.db"), provider=CSVProvider(str(tmp_path)))
+    bars = store.get("AAA", "2024-01-01", "2024-02-01")
+    revised = bars.assign(Close=bars["Close"] + 0.5)
+    assert store.upsert("AAA", revised) == len(bars)
+    assert stored_rows(store, "AAA") == (len(bars), len(bars))
+    pd.testing.assert_series_equal(store.get("AAA", "2024-01-01", "2024-02-01")["Close"], revised["Close"])
+    store.close()
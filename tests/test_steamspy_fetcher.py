@@ -0,0 +1,65 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from steamspy_fetcher import SteamSpyFetcher
+
+
+PAGES = 3
+
+
+@pytest.fixture
+def steamspy():
+    """Local stand-in for the request=all API with PAGES non-empty pages, recording requested pages."""
+    requested = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            page = int(parse_qs(urlsplit(self.path).query)["page"][0])
+            requested.append(page)
+            data = {str(page * 10 + i): {"name": f"game {page}-{i}"} for i in range(10)} if page < PAGES else {}
+            body = json.dumps(data).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/api.php", requested
+    server.shutdown()
+    server.server_close()
+
+
+def test_iter_pages_stops_at_empty_page(steamspy):
+    url, requested = steamspy
+    interval = 0.2
+    start = time.monotonic()
+    with SteamSpyFetcher(url, max_workers=4, all_interval=interval) as fetcher:
+        pages = list(fetcher.iter_pages())
+    elapsed = time.monotonic() - start
+
+    assert len(pages) == PAGES
+    # only the empty page is requested past the end, and no rate limit slot is waited out after it
+    assert sorted(requested) == list(range(PAGES + 1))
+    assert elapsed < (PAGES + 1) * interval + 0.5
+
+
+def test_iter_pages_checkpoints(steamspy, tmp_path):
+    url, requested = steamspy
+    with SteamSpyFetcher(url, all_interval=0, checkpoint_dir=tmp_path) as fetcher:
+        first = list(fetcher.iter_catalog())
+    requested.clear()
+    with SteamSpyFetcher(url, all_interval=0, checkpoint_dir=tmp_path) as fetcher:
+        again = list(fetcher.iter_catalog())
+    assert again == first
+    # the checkpointed pages come from disk; only pages past the end are asked for again
+    assert min(requested) == PAGES
@@ -0,0 +1,86 @@
+import sqlite3
+
+import pytest
+
+import task_manager
+
+
+@pytest.fixture
+def db_name(tmp_path, monkeypatch):
+    path = str(tmp_path / "tasks.db")
+    monkeypatch.setattr(task_manager, "DB_NAME", path)
+    yield path
+    task_manager.get_db().close()
+
+
+def count_tasks(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT count(*) FROM tasks").fetchone()[0]
+
+
+def test_get_db_follows_db_name(tmp_path, monkeypatch):
+    first, second = str(tmp_path / "a.db"), str(tmp_path / "b.db")
+    monkeypatch.setattr(task_manager, "DB_NAME", first)
+    task_manager.init_db()
+    monkeypatch.setattr(task_manager, "DB_NAME", second)
+    task_manager.init_db()
+    task_manager.add_task("write tests", "", "2025-01-01", verbose=False)
+
+    assert count_tasks(first) == 0
+    assert count_tasks(second) == 1
+    for path in (first, second):
+        task_manager.get_db(path).close()
+
+
+def test_transaction_rolls_back(db_name):
+    task_manager.init_db()
+    with pytest.raises(RuntimeError):
+        with task_manager.transaction():
+            task_manager.add_task("lost", "", "", verbose=False)
+            raise RuntimeError
+    assert count_tasks(db_name) == 0
+
+
+def test_batch_updates_count_only_existing_tasks(db_name):
+    task_manager.init_db()
+    task_manager.add_tasks([("a", "", None), ("b", "", None)], verbose=False)
+    assert task_manager.update_tasks([1, 999], "Done", verbose=False) == 1
+    assert task_manager.update_tasks([2, 2], "Done", verbose=False) == 1
+    assert task_manager.update_tasks([999], "Done", verbose=False) == 0
+    assert task_manager.delete_tasks([1, 1, 999], verbose=False) == 1
+    assert count_tasks(db_name) == 1
+
+
+def test_migration_moves_ambiguous_dates_to_the_description(db_name):
+    with sqlite3.connect(db_name) as conn:
+        conn.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, "
+                     "description TEXT, due_date TEXT, status TEXT DEFAULT 'Pending')")
+        conn.execute("PRAGMA user_version = 1")
+        conn.executemany("INSERT INTO tasks (title, description, due_date) VALUES (?, ?, ?)", [
+            ("iso", "", "2025-01-05"),
+            ("day first", "", "25/04/2025"),
+            ("month first", "", "04/25/2025"),
+            ("same either way", "", "05.05.2025"),
+            ("ambiguous", "call back", "03/04/2025"),
+            ("free text", None, "next friday"),
+        ])
+    conn.close()
+
+    task_manager.init_db()
+    tasks = {task.title: task for task in task_manager.iter_tasks()}
+    assert {title: task.due_date for title, task in tasks.items()} == {
+        "iso": "2025-01-05",
+        "day first": "2025-04-25",
+        "month first": "2025-04-25",
+        "same either way": "2025-05-05",
+        "ambiguous": None,
+        "free text": None,
+    }
+    assert tasks["ambiguous"].description == "call back (due: 03/04/2025)"
+    assert tasks["free text"].description == " (due: next friday)"
+
+
+def test_parse_due_date_rejects_ambiguous_dates():
+    assert task_manager.parse_due_date("2025/04/03") == "2025-04-03"
+    with pytest.raises(ValueError, match="Ambiguous"):
+        task_manager.parse_due_date("03/04/2025")
@@ -0,0 +1,92 @@
+import mmap
+import os
+import random
+
+import numpy as np
+
+
+class Corpus:
+	"""Practice passages from a text file, one per line, sampled without rereading the file.
+
+	The first time a file is used a line index (byte offset, byte length, char
+	length and difficulty of every non-empty line) is built and saved next to it
+	as <file>.idx.npz. Later runs load that index and only rebuild it when the
+	file's size or mtime changed. The text itself is read through mmap, so a
+	round only touches the bytes of the passage it picks.
+	"""
+
+	def __init__(self, path="text.txt"):
+		self.path = path
+		self.index_path = path + ".idx.npz"
+		self._file = open(path, "rb")
+		self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		self.offsets, self.byte_lengths, self.lengths, self.difficulty = self._load_index()
+		self._filtered = {}
+
+	def close(self):
+		self._mm.close()
+		self._file.close()
+
+	def __len__(self):
+		return len(self.offsets)
+
+	def _load_index(self):
+		stat = os.stat(self.path)
+		if os.path.exists(self.index_path):
+			with np.load(self.index_path) as index:
+				if index["size"] == stat.st_size and index["mtime_ns"] == stat.st_mtime_ns:
+					return index["offsets"], index["byte_lengths"], index["lengths"], index["difficulty"]
+		return self._build_index(stat)
+
+	def _build_index(self, stat):
+		offsets, byte_lengths, lengths, difficulty = [], [], [], []
+		pos = 0
+		for raw in iter(self._mm.readline, b""):
+			line = raw.strip()
+			if line:
+				text = line.decode("utf-8")
+				offsets.append(pos + len(raw) - len(raw.lstrip()))
+				byte_lengths.append(len(line))
+				lengths.append(len(text))
+				difficulty.append(line_difficulty(text))
+			pos += len(raw)
+
+		index = {
+			"offsets": np.array(offsets, dtype=np.int64),
+			"byte_lengths": np.array(byte_lengths, dtype=np.int32),
+			"lengths": np.array(lengths, dtype=np.int32),
+			"difficulty": np.array(difficulty, dtype=np.float32),
+		}
+		# write next to the corpus atomically; np.savez adds .npz to names without it
+		tmp = self.index_path[:-len(".npz")] + ".tmp.npz"
+		np.savez(tmp, size=stat.st_size, mtime_ns=stat.st_mtime_ns, **index)
+		os.replace(tmp, self.index_path)
+		return index["offsets"], index["byte_lengths"], index["lengths"], index["difficulty"]
+
+	def _candidates(self, min_length, max_length, max_difficulty):
+		key = (min_length, max_length, max_difficulty)
+		if key not in self._filtered:
+			mask = np.ones(len(self.offsets), dtype=bool)
+			if min_length is not None:
+				mask &= self.lengths >= min_length
+			if max_length is not None:
+				mask &= self.lengths <= max_length
+			if max_difficulty is not None:
+				mask &= self.difficulty <= max_difficulty
+			self._filtered[key] = np.flatnonzero(mask)
+		return self._filtered[key]
+
+	def sample(self, min_length=None, max_length=None, max_difficulty=None):
+		"""Return one random passage matching the filters."""
+		rows = self._candidates(min_length, max_length, max_difficulty)
+		if len(rows) == 0:
+			raise ValueError("No passage in the corpus matches the filters")
+		row = rows[random.randrange(len(rows))]
+		start = int(self.offsets[row])
+		return self._mm[start:start + int(self.byte_lengths[row])].decode("utf-8")
+
+
+def line_difficulty(text):
+	"""Share of characters that are not lowercase letters or spaces (0 = easiest)."""
+	hard = sum(1 for c in text if not (c.islower() or c == " "))
+	return hard / len(text)
@@ -0,0 +1,166 @@
+import array
+import os
+import time
+
+import numpy as np
+
+
+SESSIONS_FILE = "wpm_sessions.bin"
+ROLLING_WINDOW_S = 5
+
+# one fixed width record per keystroke, so the store is a flat append-only array on disk
+EVENT_DTYPE = np.dtype([
+	("session", "<i8"),
+	("t_ns", "<i8"),
+	("key", "<i4"),
+	("expected", "<i4"),
+	("pos", "<i4"),
+	("correct", "i1"),
+	("backspace", "i1"),
+])
+
+
+class KeystrokeLog:
+	"""Ring buffer of keystroke events, allocated once before the test starts.
+
+	Each column is a preallocated array.array, so recording a key only writes
+	into existing slots. Once full, the oldest events are overwritten.
+	"""
+
+	def __init__(self, capacity=4096):
+		self.capacity = capacity
+		self.count = 0
+		self.t_ns = array.array("q", bytes(8 * capacity))
+		self.key = array.array("i", bytes(4 * capacity))
+		self.expected = array.array("i", bytes(4 * capacity))
+		self.pos = array.array("i", bytes(4 * capacity))
+		self.correct = array.array("b", bytes(capacity))
+		self.backspace = array.array("b", bytes(capacity))
+
+	def record(self, key, expected, pos, correct, backspace):
+		i = self.count % self.capacity
+		self.t_ns[i] = time.perf_counter_ns()
+		self.key[i] = key
+		self.expected[i] = expected
+		self.pos[i] = pos
+		self.correct[i] = correct
+		self.backspace[i] = backspace
+		self.count += 1
+
+	def events(self, session=0):
+		"""Return the logged events, oldest first, as an EVENT_DTYPE array."""
+		n = min(self.count, self.capacity)
+		events = np.empty(n, dtype=EVENT_DTYPE)
+		events["session"] = session
+		for name in ("t_ns", "key", "expected", "pos", "correct", "backspace"):
+			column = getattr(self, name)
+			column = np.frombuffer(column, dtype=column.typecode)
+			if self.count > self.capacity:
+				column = np.roll(column, -(self.count % self.capacity))
+			events[name] = column[:n]
+		return events
+
+
+def rolling_wpm(events, window_s=ROLLING_WINDOW_S):
+	"""WPM over the last window_s seconds, evaluated at every typed character."""
+	typed = events[events["backspace"] == 0]
+	t = typed["t_ns"]
+	if len(t) == 0:
+		return np.zeros(0)
+	window_ns = window_s * 1_000_000_000
+	start = np.searchsorted(t, t - window_ns, side="right")
+	chars = np.arange(len(t)) - start + 1
+	# early in the test the window is shorter than window_s
+	span_s = np.minimum(window_ns, np.maximum(t - t[0], 1_000_000_000)) / 1e9
+	return chars / 5 / (span_s / 60)
+
+
+def bigram_latency(events):
+	"""Mean ms between two consecutive correct keystrokes, per character pair.
+
+	Returns a list of (bigram, mean_ms, count), slowest first.
+	"""
+	typed = events[events["backspace"] == 0]
+	if len(typed) < 2:
+		return []
+	prev, cur = typed[:-1], typed[1:]
+	ok = (prev["correct"] == 1) & (cur["correct"] == 1) & (cur["pos"] == prev["pos"] + 1)
+	pairs = prev["key"][ok].astype(np.int64) << 32 | cur["key"][ok]
+	latency = (cur["t_ns"][ok] - prev["t_ns"][ok]) / 1e6
+	if len(pairs) == 0:
+		return []
+
+	codes, inverse, counts = np.unique(pairs, return_inverse=True, return_counts=True)
+	means = np.bincount(inverse, weights=latency) / counts
+	order = np.argsort(-means)
+	return [(chr(codes[i] >> 32) + chr(codes[i] & 0xFFFFFFFF), float(means[i]), int(counts[i])) for i in order]
+
+
+def error_hot_spots(events):
+	"""Return [(expected_char, mistakes)] for mistyped characters, most missed first."""
+	wrong = events[(events["backspace"] == 0) & (events["correct"] == 0)]
+	if len(wrong) == 0:
+		return []
+	chars, counts = np.unique(wrong["expected"], return_counts=True)
+	order = np.argsort(-counts, kind="stable")
+	return [(chr(chars[i]), int(counts[i])) for i in order]
+
+
+def analyze(events):
+	"""Post-session summary: raw/net WPM, peak rolling WPM, slow bigrams, error hot spots."""
+	typed = events[events["backspace"] == 0]
+	if len(typed) == 0:
+		return None
+	minutes = max((events["t_ns"][-1] - events["t_ns"][0]) / 60e9, 1 / 60)
+
+	# an error is uncorrected if the last key typed at that position was wrong
+	last = np.unique(typed["pos"][::-1], return_index=True)[1]
+	uncorrected = int(np.count_nonzero(typed["correct"][::-1][last] == 0))
+
+	raw_wpm = len(typed) / 5 / minutes
+	rolling = rolling_wpm(events)
+	return {
+		"raw_wpm": float(raw_wpm),
+		"net_wpm": float(max(raw_wpm - uncorrected / minutes, 0)),
+		"peak_wpm": float(rolling.max()),
+		"keystrokes": len(events),
+		"backspaces": int(np.count_nonzero(events["backspace"])),
+		"slow_bigrams": bigram_latency(events)[:3],
+		"hot_spots": error_hot_spots(events)[:3],
+	}
+
+
+def append_session(events, path=SESSIONS_FILE):
+	"""Append one session's events to the store and flush them to disk."""
+	with open(path, "ab") as f:
+		events.tofile(f)
+		f.flush()
+		os.fsync(f.fileno())
+
+
+def load_sessions(path=SESSIONS_FILE):
+	if not os.path.exists(path):
+		return np.zeros(0, dtype=EVENT_DTYPE)
+	return np.fromfile(path, dtype=EVENT_DTYPE)
+
+
+def session_summary(events):
+	"""Per-session raw WPM and error rate for every session in the store, vectorized.
+
+	Returns (session_ids, raw_wpm, error_rate) arrays.
+	"""
+	if len(events) == 0:
+		return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+	# the store is appended one session at a time, so each session is one contiguous run
+	starts = np.flatnonzero(np.r_[True, events["session"][1:] != events["session"][:-1]])
+	ends = np.r_[starts[1:], len(events)] - 1
+
+	typed = (events["backspace"] == 0).astype(np.int64)
+	wrong = typed & (events["correct"] == 0)
+	typed_count = np.add.reduceat(typed, starts)
+	wrong_count = np.add.reduceat(wrong, starts)
+	minutes = np.maximum((events["t_ns"][ends] - events["t_ns"][starts]) / 60e9, 1 / 60)
+
+	raw_wpm = typed_count / 5 / minutes
+	error_rate = wrong_count / np.maximum(typed_count, 1)
+	return events["session"][starts], raw_wpm, error_rate